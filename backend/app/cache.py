@@ -0,0 +1,107 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from datetime import date
+from typing import Any
+
+from app.conditional import data_versions, month_scope
+from app.config import settings
+
+
+class TTLCache:
+    """Small thread-safe in-process cache with LRU eviction and per-entry TTL.
+
+    A ``ttl`` of 0 disables caching. Each worker process has its own copy,
+    so the TTL bounds how stale a value can be when another worker handled
+    the write that should have invalidated it.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 128) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> tuple[Any, float] | None:
+        """Return ``(value, age_seconds)`` or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            age = time.monotonic() - stored_at
+            if age >= self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value, age
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+dashboard_cache = TTLCache(ttl=settings.DASHBOARD_CACHE_TTL, maxsize=8)
+# Keyed by (date_from, date_to, departments); one entry per distinct query.
+department_stats_cache = TTLCache(ttl=settings.DASHBOARD_CACHE_TTL, maxsize=64)
+# Keyed by (year, employee_ids, department).
+bitmap_cache = TTLCache(ttl=settings.BITMAP_CACHE_TTL, maxsize=32)
+# Positive-only cache of employee IDs known to exist. A miss always goes to
+# the database, and the attendance FK rejects rows for an employee deleted
+# by another worker while its ID was still cached here.
+employee_cache = TTLCache(
+    ttl=settings.EMPLOYEE_CACHE_TTL, maxsize=settings.EMPLOYEE_CACHE_SIZE
+)
+
+CACHES = {
+    "dashboard": dashboard_cache,
+    "department_stats": department_stats_cache,
+    "bitmap": bitmap_cache,
+    "employee": employee_cache,
+}
+
+
+def invalidate_attendance_caches(days: Iterable[date] | None = None) -> None:
+    """Drop derived attendance caches and bump ETag versions.
+
+    ``days`` narrows the version bump to the months written; None bumps
+    every attendance scope.
+    """
+    dashboard_cache.clear()
+    department_stats_cache.clear()
+    bitmap_cache.clear()
+    if days is None:
+        data_versions.bump("attendance")
+    else:
+        data_versions.bump(*{month_scope(day) for day in days})
+
+
+def invalidate_employee_caches() -> None:
+    dashboard_cache.clear()
+    department_stats_cache.clear()
+    bitmap_cache.clear()
+    data_versions.bump("employees")
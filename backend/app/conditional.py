@@ -0,0 +1,96 @@
+import secrets
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import date
+from email.utils import formatdate
+
+from fastapi import HTTPException, Request, status
+
+from app.config import settings
+
+
+class DataVersions:
+    """Per-scope write counters used to build ETags without touching the DB.
+
+    CRUD writes bump the scopes they change (via the invalidate_* helpers in
+    app.cache); reads turn the versions of the scopes they depend on into an
+    ETag. Counters live in this process only: the tag carries a per-process
+    epoch, so another worker never matches it, and an ETAG_TTL time bucket,
+    so a write handled by another worker is seen within that window.
+    """
+
+    def __init__(self) -> None:
+        self._epoch = secrets.token_hex(4)
+        self._started = time.time()
+        self._versions: dict[str, tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, *scopes: str) -> None:
+        now = time.time()
+        with self._lock:
+            for scope in scopes:
+                version, _ = self._versions.get(scope, (0, now))
+                self._versions[scope] = (version + 1, now)
+
+    def snapshot(self, scopes: Iterable[str]) -> tuple[str, float]:
+        """Return ``(etag, last_modified_timestamp)`` for ``scopes``."""
+        with self._lock:
+            entries = [self._versions.get(s, (0, self._started)) for s in scopes]
+        versions = ".".join(str(version) for version, _ in entries)
+        last_modified = max((ts for _, ts in entries), default=self._started)
+        bucket = int(time.time() // settings.ETAG_TTL)
+        return f'W/"{self._epoch}-{bucket}-{versions}"', last_modified
+
+
+data_versions = DataVersions()
+
+
+def month_scope(day: date) -> str:
+    return f"attendance:{day.year:04d}-{day.month:02d}"
+
+
+def attendance_month_scopes(month: str) -> tuple[str, ...]:
+    """Scopes behind a ``YYYY-MM`` month's attendance views.
+
+    Rosters list every employee and the rollup changes when one is deleted,
+    so employee writes count too. ``month`` comes from raw path parameters;
+    a malformed value just yields a scope nothing ever bumps.
+    """
+    return ("employees", "attendance", f"attendance:{month}")
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
+
+
+def conditional_get(scopes: Callable[[Request], Iterable[str]]):
+    """Dependency factory answering ``If-None-Match`` with 304 up front.
+
+    Runs before the handler, so a match costs no query and builds no model.
+    Otherwise the tag is left on ``request.state`` for the middleware in
+    app.main to attach as ETag/Last-Modified.
+    """
+
+    async def dependency(request: Request) -> None:
+        if settings.ETAG_TTL <= 0:
+            return
+        etag, last_modified = data_versions.snapshot(scopes(request))
+        last_modified_header = formatdate(last_modified, usegmt=True)
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag, "Last-Modified": last_modified_header},
+            )
+        request.state.etag = etag
+        request.state.last_modified = last_modified_header
+
+    return dependency
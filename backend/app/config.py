@@ -1,9 +1,41 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     ALLOWED_ORIGINS: str = "http://localhost:5173"
+    DASHBOARD_CACHE_TTL: float = 30.0
+    BITMAP_CACHE_TTL: float = 60.0
+    ETAG_TTL: float = 300.0
+    PUNCH_QUEUE_ENABLED: bool = False
+    PUNCH_QUEUE_MAX_SIZE: int = 10000
+    PUNCH_FLUSH_INTERVAL_MS: float = 50.0
+    PUNCH_FLUSH_MAX_ROWS: int = 500
+    PUNCH_ENQUEUE_TIMEOUT: float = 5.0
+    PUNCH_COMMIT_TIMEOUT: float = 10.0
+    PUNCH_SPOOL_DIR: str = "punch_spool"
+    EMPLOYEE_CACHE_TTL: float = 300.0
+    EMPLOYEE_CACHE_SIZE: int = 10000
+    ASYNC_DB: bool = False
+    DB_POOL_STRATEGY: Literal["queue", "null"] = "queue"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 300
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_HEALTH_INTERVAL: float = 30.0
+    ATTENDANCE_PARTITIONING: bool = False
+    ATTENDANCE_PARTITIONS_AHEAD: int = 3
+    READ_REPLICA_URL: str | None = None
+    REPLICA_STICKY_SECONDS: float = 5.0
+    REPLICA_RETRY_SECONDS: float = 30.0
+    QUERY_BUDGET_MODE: Literal["off", "warn", "raise"] = "warn"
+    QUERY_COUNT_HEADER: bool = False
+    SLOW_QUERY_MS: float = 500.0
+    SLOW_QUERY_SAMPLE_RATE: float = 0.25
+    SLOW_QUERY_EXPLAIN_ANALYZE: bool = False
 
     @property
     def allowed_origins_list(self) -> list[str]:
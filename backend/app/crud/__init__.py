@@ -1,29 +1,51 @@
 from app.crud.employee import (
     create_employee,
     get_all_employees,
+    get_employee_page,
+    count_employees,
     get_employee_by_id,
+    employee_exists,
     delete_employee,
 )
 from app.crud.attendance import (
     mark_attendance,
     upsert_attendance,
     bulk_upsert_attendance,
+    mark_attendance_range,
     get_attendance_by_employee,
     get_attendance_summary,
+    get_attendance_summaries,
     get_attendance_by_date,
     get_month_summary,
+    get_attendance_bitmaps,
+    iter_attendance_export,
+)
+from app.crud.rollup import (
+    apply_rollup_delta,
+    refresh_daily_rollup,
+    get_daily_rollup,
 )
 
 __all__ = [
     "create_employee",
     "get_all_employees",
+    "get_employee_page",
+    "count_employees",
     "get_employee_by_id",
+    "employee_exists",
     "delete_employee",
     "mark_attendance",
     "upsert_attendance",
     "bulk_upsert_attendance",
+    "mark_attendance_range",
     "get_attendance_by_employee",
     "get_attendance_summary",
+    "get_attendance_summaries",
     "get_attendance_by_date",
     "get_month_summary",
+    "get_attendance_bitmaps",
+    "iter_attendance_export",
+    "apply_rollup_delta",
+    "refresh_daily_rollup",
+    "get_daily_rollup",
 ]
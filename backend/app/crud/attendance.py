@@ -1,14 +1,44 @@
+import base64
 import calendar
-from datetime import date
-
+from collections.abc import Iterator
+from datetime import date, timedelta
+from typing import Any
+
+from sqlalchemy import (
+    Date,
+    Row,
+    and_,
+    case,
+    cast,
+    func,
+    insert,
+    literal,
+    literal_column,
+    select,
+    text,
+    true,
+    union_all,
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.cache import employee_cache, invalidate_attendance_caches
+from app.database import dialect_insert
 from app.models.employee import Employee
 from app.models.attendance import Attendance
+from app.crud.employee import employee_exists
+from app.crud.rollup import (
+    apply_rollup_delta,
+    get_daily_rollup,
+    refresh_daily_rollup,
+    status_delta,
+)
 from app.schemas.attendance import (
     AttendanceCreate,
+    AttendanceRangeCreate,
+    AttendanceRangeResponse,
     AttendanceSummary,
-    DateAttendanceRecord,
+    BulkAttendanceError,
     MonthSummaryDay,
 )
 from app.exceptions import (
@@ -17,78 +47,293 @@ from app.exceptions import (
 )
 
 
-def mark_attendance(db: Session, attendance_data: AttendanceCreate) -> Attendance:
-    employee = (
-        db.query(Employee)
-        .filter(Employee.employee_id == attendance_data.employee_id)
-        .first()
-    )
-    if not employee:
-        raise EmployeeNotFoundError(attendance_data.employee_id)
-
-    existing = (
-        db.query(Attendance)
-        .filter(
-            Attendance.employee_id == attendance_data.employee_id,
-            Attendance.date == attendance_data.date,
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+def _is_foreign_key_violation(exc: IntegrityError) -> bool:
+    code = getattr(exc.orig, "pgcode", None) or getattr(exc.orig, "sqlstate", None)
+    if code:
+        return code == FOREIGN_KEY_VIOLATION
+    return "foreign key" in str(exc.orig).lower()
+
+
+def _raise_for_integrity_error(
+    exc: IntegrityError, attendance_data: AttendanceCreate
+) -> None:
+    """Translate an attendance constraint violation into the domain error.
+
+    The FK on employee_id means the employee does not exist (or was deleted
+    while cached in employee_cache); anything else is uq_employee_date.
+    """
+    if _is_foreign_key_violation(exc):
+        employee_cache.discard(attendance_data.employee_id)
+        raise EmployeeNotFoundError(attendance_data.employee_id) from exc
+    raise DuplicateAttendanceError(
+        attendance_data.employee_id, str(attendance_data.date)
+    ) from exc
+
+
+def mark_attendance(db: Session, attendance_data: AttendanceCreate) -> Row:
+    """Insert one attendance row with a single INSERT ... RETURNING.
+
+    There are no pre-check SELECTs: the employee FK and uq_employee_date
+    decide, which also makes concurrent submissions for the same
+    employee and day race-free.
+    """
+    stmt = (
+        insert(Attendance)
+        .values(**attendance_data.model_dump())
+        .returning(
+            Attendance.id,
+            Attendance.employee_id,
+            Attendance.date,
+            Attendance.status,
+            Attendance.created_at,
         )
-        .first()
     )
-    if existing:
-        raise DuplicateAttendanceError(
-            attendance_data.employee_id, str(attendance_data.date)
+    try:
+        record = db.execute(stmt).one()
+        apply_rollup_delta(
+            db, record.date, headcount=1, **status_delta(record.status)
         )
-
-    record = Attendance(**attendance_data.model_dump())
-    db.add(record)
-    db.commit()
-    db.refresh(record)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        _raise_for_integrity_error(e, attendance_data)
+    invalidate_attendance_caches([record.date])
     return record
 
 
-def upsert_attendance(db: Session, attendance_data: AttendanceCreate) -> Attendance:
-    employee = (
-        db.query(Employee)
-        .filter(Employee.employee_id == attendance_data.employee_id)
-        .first()
+def upsert_attendance(db: Session, attendance_data: AttendanceCreate) -> Row:
+    """Insert or update one attendance row with a single upsert.
+
+    The DO UPDATE only fires when the status changes, so a returned row is
+    either new or flipped to the other status, and a repeat of the stored
+    status returns nothing. Like mark_attendance, the employee FK stands in
+    for a pre-check and concurrent PUTs for the same day cannot collide.
+
+    On PostgreSQL ``xmax = 0`` tells a fresh insert from an update, which is
+    enough to apply a rollup delta. SQLite has no equivalent, but it only
+    ever has one writer, so the day's rollup is recomputed instead.
+    """
+    columns = (
+        Attendance.id,
+        Attendance.employee_id,
+        Attendance.date,
+        Attendance.status,
+        Attendance.created_at,
     )
-    if not employee:
-        raise EmployeeNotFoundError(attendance_data.employee_id)
-
-    existing = (
-        db.query(Attendance)
-        .filter(
-            Attendance.employee_id == attendance_data.employee_id,
-            Attendance.date == attendance_data.date,
-        )
-        .first()
+    postgres = db.get_bind().dialect.name == "postgresql"
+    stmt = dialect_insert(db, Attendance).values(**attendance_data.model_dump())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Attendance.employee_id, Attendance.date],
+        set_={"status": stmt.excluded.status},
+        where=Attendance.status != stmt.excluded.status,
+    ).returning(
+        *columns,
+        *([literal_column("xmax = 0").label("inserted")] if postgres else []),
     )
-
-    if existing:
-        existing.status = attendance_data.status
+    try:
+        record = db.execute(stmt).one_or_none()
+        if record is None:
+            record = db.execute(
+                select(*columns).where(
+                    Attendance.employee_id == attendance_data.employee_id,
+                    Attendance.date == attendance_data.date,
+                )
+            ).one()
+            # Ends the transaction, releasing the lock the upsert took.
+            db.commit()
+            return record
+
+        if not postgres:
+            refresh_daily_rollup(db, [record.date])
+        elif record.inserted:
+            apply_rollup_delta(
+                db, record.date, headcount=1, **status_delta(record.status)
+            )
+        else:
+            # Only two statuses exist, so the previous one is the other.
+            previous = "Absent" if record.status == "Present" else "Present"
+            apply_rollup_delta(
+                db,
+                record.date,
+                **status_delta(previous, -1),
+                **status_delta(record.status),
+            )
         db.commit()
-        db.refresh(existing)
-        return existing
-
-    record = Attendance(**attendance_data.model_dump())
-    db.add(record)
-    db.commit()
-    db.refresh(record)
+    except IntegrityError as e:
+        db.rollback()
+        _raise_for_integrity_error(e, attendance_data)
+    invalidate_attendance_caches([record.date])
     return record
 
 
+BULK_CHUNK_SIZE = 1000
+
+
 def bulk_upsert_attendance(
     db: Session, records: list[AttendanceCreate]
-) -> tuple[list[Attendance], int]:
-    results = []
-    failed = 0
-    for item in records:
+) -> tuple[list[Row], list[BulkAttendanceError]]:
+    errors: list[BulkAttendanceError] = []
+
+    requested_ids = {item.employee_id for item in records}
+    known_ids: set[str] = set()
+    if requested_ids:
+        known_ids = set(
+            db.scalars(
+                select(Employee.employee_id).where(
+                    Employee.employee_id.in_(requested_ids)
+                )
+            )
+        )
+
+    # Later entries for the same (employee_id, date) win, matching the
+    # previous row-by-row behaviour. A single ON CONFLICT statement cannot
+    # touch the same row twice, so collapse them before writing and report
+    # each superseded entry as failed, keeping success + failed == len(records).
+    rows: dict[tuple[str, date], tuple[int, dict]] = {}
+    for index, item in enumerate(records):
+        if item.employee_id not in known_ids:
+            errors.append(
+                BulkAttendanceError(
+                    index=index,
+                    employee_id=item.employee_id,
+                    date=item.date,
+                    detail=str(EmployeeNotFoundError(item.employee_id)),
+                )
+            )
+            continue
+        key = (item.employee_id, item.date)
+        if key in rows:
+            errors.append(
+                BulkAttendanceError(
+                    index=rows[key][0],
+                    employee_id=item.employee_id,
+                    date=item.date,
+                    detail=(
+                        "Superseded by a later record for the same employee "
+                        "and date in this request"
+                    ),
+                )
+            )
+        rows[key] = (index, item.model_dump())
+    errors.sort(key=lambda error: error.index)
+
+    values = [value for _, value in rows.values()]
+    results: list[Row] = []
+    try:
+        for start in range(0, len(values), BULK_CHUNK_SIZE):
+            stmt = dialect_insert(db, Attendance).values(
+                values[start:start + BULK_CHUNK_SIZE]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Attendance.employee_id, Attendance.date],
+                set_={"status": stmt.excluded.status},
+            ).returning(
+                Attendance.id,
+                Attendance.employee_id,
+                Attendance.date,
+                Attendance.status,
+                Attendance.created_at,
+            )
+            results.extend(db.execute(stmt).all())
+        written_dates = {r.date for r in results}
+        refresh_daily_rollup(db, written_dates)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidate_attendance_caches(written_dates)
+    return results, errors
+
+
+def _date_series(db: Session, start: date, end: date):
+    """A one-column (``day``) selectable covering ``start``..``end`` inclusive."""
+    if db.get_bind().dialect.name == "postgresql":
+        return select(
+            cast(
+                func.generate_series(start, end, text("interval '1 day'")), Date
+            ).label("day")
+        ).subquery("days")
+    days = [start + timedelta(days=n) for n in range((end - start).days + 1)]
+    return union_all(
+        *(select(literal(day, Date).label("day")) for day in days)
+    ).subquery("days")
+
+
+def mark_attendance_range(
+    db: Session, request: AttendanceRangeCreate
+) -> AttendanceRangeResponse:
+    """Mark employees x days in one ``INSERT ... SELECT``.
+
+    The cross join of the selected employees with a generated date series is
+    written in a single statement; existing rows are left alone ("skip") or
+    have their status replaced ("overwrite"), via uq_employee_date.
+    """
+    not_found: list[str] = []
+    if request.employee_ids is not None:
+        requested = list(dict.fromkeys(request.employee_ids))
+        known = set(
+            db.scalars(
+                select(Employee.employee_id).where(
+                    Employee.employee_id.in_(requested)
+                )
+            )
+        )
+        not_found = [eid for eid in requested if eid not in known]
+        selector = Employee.employee_id.in_(known)
+        employees = len(known)
+    else:
+        selector = Employee.department == request.department
+        employees = db.scalar(select(func.count(Employee.id)).where(selector))
+
+    days = (request.date_to - request.date_from).days + 1
+    range_dates = [request.date_from + timedelta(days=n) for n in range(days)]
+    written = 0
+    if employees:
+        series = _date_series(db, request.date_from, request.date_to)
+        source = (
+            select(
+                Employee.employee_id,
+                series.c.day,
+                literal(request.status, Attendance.status.type),
+            )
+            .select_from(Employee)
+            .join(series, true())
+            .where(selector)
+        )
+        stmt = dialect_insert(db, Attendance).from_select(
+            ["employee_id", "date", "status"], source
+        )
+        if request.on_existing == "overwrite":
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Attendance.employee_id, Attendance.date],
+                set_={"status": stmt.excluded.status},
+                where=Attendance.status != stmt.excluded.status,
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(
+                index_elements=[Attendance.employee_id, Attendance.date]
+            )
         try:
-            result = upsert_attendance(db, item)
-            results.append(result)
+            written = db.execute(stmt).rowcount
+            if written:
+                refresh_daily_rollup(db, range_dates)
+            db.commit()
         except Exception:
-            failed += 1
-    return results, failed
+            db.rollback()
+            raise
+        if written:
+            invalidate_attendance_caches(range_dates)
+
+    return AttendanceRangeResponse(
+        employees=employees,
+        days=days,
+        written=written,
+        skipped=employees * days - written,
+        not_found=not_found,
+    )
 
 
 def get_attendance_by_employee(
@@ -96,70 +341,254 @@ def get_attendance_by_employee(
     employee_id: str,
     date_from: date | None = None,
     date_to: date | None = None,
-) -> list[Attendance]:
-    employee = (
-        db.query(Employee).filter(Employee.employee_id == employee_id).first()
-    )
-    if not employee:
+) -> list[dict[str, Any]]:
+    if not employee_exists(db, employee_id):
         raise EmployeeNotFoundError(employee_id)
 
-    query = db.query(Attendance).filter(Attendance.employee_id == employee_id)
+    query = select(
+        Attendance.id,
+        Attendance.employee_id,
+        Attendance.date,
+        Attendance.status,
+        Attendance.created_at,
+    ).where(Attendance.employee_id == employee_id)
 
     if date_from:
-        query = query.filter(Attendance.date >= date_from)
+        query = query.where(Attendance.date >= date_from)
     if date_to:
-        query = query.filter(Attendance.date <= date_to)
+        query = query.where(Attendance.date <= date_to)
 
-    return query.order_by(Attendance.date.desc()).all()
+    rows = db.execute(query.order_by(Attendance.date.desc()))
+    return [row._asdict() for row in rows]
 
 
-def get_attendance_summary(db: Session, employee_id: str) -> AttendanceSummary:
-    employee = (
-        db.query(Employee).filter(Employee.employee_id == employee_id).first()
+def _summarize_attendance(
+    db: Session,
+    employee_filters: list,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> list[AttendanceSummary]:
+    join_on = [Attendance.employee_id == Employee.employee_id]
+    if date_from:
+        join_on.append(Attendance.date >= date_from)
+    if date_to:
+        join_on.append(Attendance.date <= date_to)
+
+    query = (
+        select(
+            Employee.employee_id,
+            Employee.full_name,
+            Attendance.status,
+            func.count(Attendance.id),
+        )
+        .outerjoin(Attendance, and_(*join_on))
+        .where(*employee_filters)
+        .group_by(Employee.employee_id, Employee.full_name, Attendance.status)
+        .order_by(Employee.employee_id)
     )
-    if not employee:
-        raise EmployeeNotFoundError(employee_id)
 
-    records = (
-        db.query(Attendance).filter(Attendance.employee_id == employee_id).all()
-    )
+    summaries: dict[str, AttendanceSummary] = {}
+    for employee_id, full_name, status, count in db.execute(query):
+        summary = summaries.get(employee_id)
+        if summary is None:
+            summary = summaries[employee_id] = AttendanceSummary(
+                employee_id=employee_id,
+                full_name=full_name,
+                total_days=0,
+                present_days=0,
+                absent_days=0,
+            )
+        summary.total_days += count
+        if status == "Present":
+            summary.present_days += count
+        elif status == "Absent":
+            summary.absent_days += count
+    return list(summaries.values())
 
-    total_days = len(records)
-    present_days = sum(1 for r in records if r.status == "Present")
-    absent_days = sum(1 for r in records if r.status == "Absent")
 
-    return AttendanceSummary(
-        employee_id=employee.employee_id,
-        full_name=employee.full_name,
-        total_days=total_days,
-        present_days=present_days,
-        absent_days=absent_days,
-    )
+def get_attendance_summary(db: Session, employee_id: str) -> AttendanceSummary:
+    summaries = _summarize_attendance(db, [Employee.employee_id == employee_id])
+    if not summaries:
+        raise EmployeeNotFoundError(employee_id)
+    return summaries[0]
+
+
+def get_attendance_summaries(
+    db: Session,
+    employee_ids: list[str] | None = None,
+    department: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> list[AttendanceSummary]:
+    filters = []
+    if employee_ids:
+        filters.append(Employee.employee_id.in_(employee_ids))
+    if department:
+        filters.append(Employee.department == department)
+    return _summarize_attendance(db, filters, date_from, date_to)
 
 
 def get_attendance_by_date(
-    db: Session, target_date: date
-) -> list[DateAttendanceRecord]:
-    employees = db.query(Employee).order_by(Employee.employee_id).all()
-    attendance_map = {}
-
-    records = db.query(Attendance).filter(Attendance.date == target_date).all()
-    for r in records:
-        attendance_map[r.employee_id] = (r.status, r.id)
-
-    result = []
-    for emp in employees:
-        status_info = attendance_map.get(emp.employee_id)
-        result.append(
-            DateAttendanceRecord(
-                employee_id=emp.employee_id,
-                full_name=emp.full_name,
-                department=emp.department,
-                status=status_info[0] if status_info else None,
-                attendance_id=status_info[1] if status_info else None,
-            )
+    db: Session,
+    target_date: date,
+    department: str | None = None,
+    status: str | None = None,
+    limit: int | None = None,
+    after: str | None = None,
+) -> dict[str, Any]:
+    """Return the day's roster and counts from a single query.
+
+    Counts cover every employee matching ``department``; ``status``
+    ("Present", "Absent" or "unmarked"), ``after`` and ``limit`` only narrow
+    which records are returned. Counts sit in a one-row CTE that is LEFT
+    JOINed to the page, so they come back even when the page is empty.
+    The result is shaped like DateAttendanceResponse but made of plain
+    dicts, ready for direct JSON encoding.
+    """
+    roster = (
+        select(
+            Employee.employee_id,
+            Employee.full_name,
+            Employee.department,
+            Attendance.status,
+            Attendance.id.label("attendance_id"),
+        )
+        .outerjoin(
+            Attendance,
+            and_(
+                Attendance.employee_id == Employee.employee_id,
+                Attendance.date == target_date,
+            ),
         )
-    return result
+        .where(Employee.department == department if department else true())
+        .cte("roster")
+    )
+
+    def count_where(condition):
+        return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+    counts = select(
+        count_where(roster.c.status == "Present").label("present"),
+        count_where(roster.c.status == "Absent").label("absent"),
+        count_where(roster.c.status.is_(None)).label("unmarked"),
+    ).cte("counts")
+
+    page = select(roster)
+    if status == "unmarked":
+        page = page.where(roster.c.status.is_(None))
+    elif status:
+        page = page.where(roster.c.status == status)
+    if after:
+        page = page.where(roster.c.employee_id > after)
+    page = page.order_by(roster.c.employee_id)
+    if limit is not None:
+        page = page.limit(limit + 1)
+    page = page.subquery("page")
+
+    rows = db.execute(
+        select(counts, page)
+        .select_from(counts.outerjoin(page, true()))
+        .order_by(page.c.employee_id)
+    ).all()
+
+    present, absent, unmarked = rows[0].present, rows[0].absent, rows[0].unmarked
+    records = [
+        {
+            "employee_id": row.employee_id,
+            "full_name": row.full_name,
+            "department": row.department,
+            "status": row.status,
+            "attendance_id": row.attendance_id,
+        }
+        for row in rows
+        if row.employee_id is not None
+    ]
+
+    next_cursor = None
+    if limit is not None and len(records) > limit:
+        records = records[:limit]
+        next_cursor = records[-1]["employee_id"]
+
+    total = {
+        "Present": present,
+        "Absent": absent,
+        "unmarked": unmarked,
+    }.get(status, present + absent + unmarked)
+
+    return {
+        "date": target_date,
+        "records": records,
+        "present": present,
+        "absent": absent,
+        "unmarked": unmarked,
+        "total": total,
+        "next_cursor": next_cursor,
+    }
+
+
+def get_attendance_bitmaps(
+    db: Session,
+    year: int,
+    employee_ids: list[str] | None = None,
+    department: str | None = None,
+) -> dict[str, Any]:
+    """Pack a year of attendance per employee into two bitsets.
+
+    One ordered pass over employees LEFT JOIN the year's attendance rows;
+    employees with nothing recorded still get (all-zero) bitsets. The
+    result is shaped like AttendanceBitmapResponse, as plain dicts.
+    """
+    first_day = date(year, 1, 1)
+    days = (date(year + 1, 1, 1) - first_day).days
+    size = (days + 7) // 8
+
+    query = (
+        select(Employee.employee_id, Attendance.date, Attendance.status)
+        .outerjoin(
+            Attendance,
+            and_(
+                Attendance.employee_id == Employee.employee_id,
+                Attendance.date >= first_day,
+                Attendance.date < date(year + 1, 1, 1),
+            ),
+        )
+        .order_by(Employee.employee_id)
+    )
+    if employee_ids:
+        query = query.where(Employee.employee_id.in_(employee_ids))
+    if department:
+        query = query.where(Employee.department == department)
+
+    employees: list[dict[str, str]] = []
+    current: str | None = None
+    marked = present = bytearray()
+
+    def flush() -> None:
+        employees.append(
+            {
+                "employee_id": current,
+                "marked": base64.b64encode(marked).decode("ascii"),
+                "present": base64.b64encode(present).decode("ascii"),
+            }
+        )
+
+    for employee_id, day, status in db.execute(query):
+        if employee_id != current:
+            if current is not None:
+                flush()
+            current = employee_id
+            marked, present = bytearray(size), bytearray(size)
+        if day is None:
+            continue
+        n = (day - first_day).days
+        byte, bit = n >> 3, 1 << (n & 7)
+        marked[byte] |= bit
+        if status == "Present":
+            present[byte] |= bit
+    if current is not None:
+        flush()
+
+    return {"year": year, "days": days, "employees": employees}
 
 
 def get_month_summary(
@@ -169,28 +598,39 @@ def get_month_summary(
     start = date(year, month, 1)
     end = date(year, month, last_day)
 
-    records = (
-        db.query(Attendance)
-        .filter(Attendance.date >= start, Attendance.date <= end)
-        .all()
-    )
+    return [
+        MonthSummaryDay(date=day.date, present=day.present, absent=day.absent)
+        for day in get_daily_rollup(db, start, end)
+    ]
 
-    day_map: dict[date, dict[str, int]] = {}
-    for r in records:
-        if r.date not in day_map:
-            day_map[r.date] = {"present": 0, "absent": 0}
-        if r.status == "Present":
-            day_map[r.date]["present"] += 1
-        else:
-            day_map[r.date]["absent"] += 1
-
-    result = []
-    for d, counts in sorted(day_map.items()):
-        result.append(
-            MonthSummaryDay(
-                date=d,
-                present=counts["present"],
-                absent=counts["absent"],
-            )
+
+EXPORT_BATCH_SIZE = 2000
+EXPORT_COLUMNS = ("employee_id", "full_name", "department", "date", "status")
+
+
+def iter_attendance_export(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[list[Row]]:
+    """Yield attendance rows joined with employees in batches of ``batch_size``.
+
+    ``yield_per`` makes the driver use a server-side cursor, so only one
+    batch is held in memory at a time.
+    """
+    stmt = (
+        select(
+            Attendance.employee_id,
+            Employee.full_name,
+            Employee.department,
+            Attendance.date,
+            Attendance.status,
         )
-    return result
+        .join(Employee, Employee.employee_id == Attendance.employee_id)
+        .where(Attendance.date >= date_from, Attendance.date <= date_to)
+        .order_by(Attendance.date, Attendance.employee_id)
+        .execution_options(yield_per=batch_size)
+    )
+    for partition in db.execute(stmt).partitions():
+        yield partition
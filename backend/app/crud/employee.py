@@ -1,8 +1,31 @@
+import base64
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Select, func, select, tuple_
 from sqlalchemy.orm import Session
 
+from app.cache import employee_cache, invalidate_employee_caches
+from app.crud.rollup import refresh_daily_rollup
+from app.database import reads_replica
+from app.models.attendance import Attendance
 from app.models.employee import Employee
 from app.schemas.employee import EmployeeCreate
-from app.exceptions import DuplicateEmployeeError, EmployeeNotFoundError
+from app.exceptions import (
+    DuplicateEmployeeError,
+    EmployeeNotFoundError,
+    ValidationError,
+)
+
+EMPLOYEE_FIELDS = (
+    "id",
+    "employee_id",
+    "full_name",
+    "email",
+    "department",
+    "created_at",
+    "updated_at",
+)
 
 
 def create_employee(db: Session, employee_data: EmployeeCreate) -> Employee:
@@ -21,12 +44,105 @@ def create_employee(db: Session, employee_data: EmployeeCreate) -> Employee:
     employee = Employee(**cleaned)
     db.add(employee)
     db.commit()
+    invalidate_employee_caches()
+    # The instance is expired after commit; reading employee.employee_id
+    # here would reload the row before the refresh below.
+    employee_cache.set(cleaned["employee_id"], True)
     db.refresh(employee)
     return employee
 
 
-def get_all_employees(db: Session) -> list[Employee]:
-    return db.query(Employee).order_by(Employee.created_at.desc()).all()
+def employee_exists(db: Session, employee_id: str) -> bool:
+    """Check an employee ID, answering from employee_cache when possible."""
+    if employee_cache.get(employee_id) is not None:
+        return True
+    found = db.scalar(
+        select(Employee.id).where(Employee.employee_id == employee_id)
+    )
+    if found is None:
+        return False
+    if not reads_replica(db):
+        employee_cache.set(employee_id, True)
+    return True
+
+
+def encode_cursor(created_at: datetime, employee_pk: int) -> str:
+    raw = f"{created_at.isoformat()}|{employee_pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, employee_pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(employee_pk)
+    except ValueError:
+        raise ValidationError(f"Invalid cursor: {cursor}")
+
+
+def _employee_select(fields: list[str]) -> Select:
+    unknown = [f for f in fields if f not in EMPLOYEE_FIELDS]
+    if unknown:
+        raise ValidationError(f"Unknown employee field(s): {', '.join(unknown)}")
+    return select(
+        *(getattr(Employee, f) for f in fields),
+        Employee.created_at.label("cursor_created_at"),
+        Employee.id.label("cursor_id"),
+    ).order_by(Employee.created_at.desc(), Employee.id.desc())
+
+
+def _fetch_employees(
+    db: Session, query: Select, fields: list[str]
+) -> tuple[list[dict[str, Any]], list[tuple[datetime, int]]]:
+    # Plain column rows rather than ORM objects: list responses are encoded
+    # straight from these dicts without building Pydantic models.
+    rows = db.execute(query).all()
+    return (
+        [{f: row._mapping[f] for f in fields} for row in rows],
+        [(row.cursor_created_at, row.cursor_id) for row in rows],
+    )
+
+
+def get_all_employees(
+    db: Session, fields: list[str] | None = None
+) -> list[dict[str, Any]]:
+    fields = fields or list(EMPLOYEE_FIELDS)
+    employees, _ = _fetch_employees(db, _employee_select(fields), fields)
+    return employees
+
+
+def get_employee_page(
+    db: Session,
+    limit: int,
+    cursor: str | None = None,
+    fields: list[str] | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+    fields = fields or list(EMPLOYEE_FIELDS)
+    query = _employee_select(fields)
+    if cursor:
+        created_at, employee_pk = decode_cursor(cursor)
+        # Compare against the anchor row's own stored created_at: SQLite keeps
+        # server_default timestamps as second-precision text, which a bound
+        # datetime (rendered with microseconds) does not sort consistently
+        # with. The cursor's timestamp only stands in if the row is deleted.
+        anchor = (
+            select(Employee.created_at)
+            .where(Employee.id == employee_pk)
+            .scalar_subquery()
+        )
+        query = query.where(
+            tuple_(Employee.created_at, Employee.id)
+            < tuple_(func.coalesce(anchor, created_at), employee_pk)
+        )
+
+    employees, keys = _fetch_employees(db, query.limit(limit + 1), fields)
+    if len(employees) <= limit:
+        return employees, None
+    return employees[:limit], encode_cursor(*keys[limit - 1])
+
+
+def count_employees(db: Session) -> int:
+    return db.scalar(select(func.count()).select_from(Employee))
 
 
 def get_employee_by_id(db: Session, employee_id: str) -> Employee:
@@ -40,6 +156,13 @@ def delete_employee(db: Session, employee_id: str) -> Employee:
     employee = db.query(Employee).filter(Employee.employee_id == employee_id).first()
     if not employee:
         raise EmployeeNotFoundError(employee_id)
+    dates = set(
+        db.scalars(select(Attendance.date).where(Attendance.employee_id == employee_id))
+    )
     db.delete(employee)
+    db.flush()
+    refresh_daily_rollup(db, dates)
     db.commit()
+    employee_cache.discard(employee_id)
+    invalidate_employee_caches()
     return employee
@@ -0,0 +1,126 @@
+from collections.abc import Iterable
+from datetime import date
+
+from sqlalchemy import case, delete, func, select, text, true
+from sqlalchemy.orm import Session
+
+from app.database import dialect_insert
+from app.models.attendance import Attendance
+from app.models.rollup import DailyAttendanceRollup
+
+ROLLUP_COUNTS = ("present", "absent", "headcount")
+
+
+def status_delta(status: str, sign: int = 1) -> dict[str, int]:
+    key = "present" if status == "Present" else "absent"
+    return {key: sign}
+
+
+def apply_rollup_delta(
+    db: Session,
+    day: date,
+    present: int = 0,
+    absent: int = 0,
+    headcount: int = 0,
+) -> None:
+    stmt = dialect_insert(db, DailyAttendanceRollup).values(
+        date=day, present=present, absent=absent, headcount=headcount
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyAttendanceRollup.date],
+        set_={
+            col: getattr(DailyAttendanceRollup, col) + getattr(stmt.excluded, col)
+            for col in ROLLUP_COUNTS
+        },
+    )
+    db.execute(stmt)
+
+
+def _lock_rollup_rows(db: Session, dates: set[date] | None) -> None:
+    """Lock the rollup rows a recompute is about to overwrite (PostgreSQL).
+
+    The recompute counts from the snapshot its statement starts with, so a
+    concurrent writer that had already applied a delta but not committed
+    would be overwritten with stale counts. Locking first, in a statement of
+    its own, waits such writers out, and makes later ones wait for us, so
+    their delta lands on top of our counts. Missing rows are created to be
+    locked too; dates are taken in order so two recomputes cannot deadlock.
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    if dates is None:
+        db.execute(
+            text(
+                f"LOCK TABLE {DailyAttendanceRollup.__tablename__} "
+                "IN SHARE ROW EXCLUSIVE MODE"
+            )
+        )
+        return
+    stmt = dialect_insert(db, DailyAttendanceRollup).values(
+        [{"date": day} for day in sorted(dates)]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyAttendanceRollup.date],
+        set_={"headcount": DailyAttendanceRollup.headcount},
+    )
+    db.execute(stmt)
+
+
+def refresh_daily_rollup(db: Session, dates: Iterable[date] | None = None) -> int:
+    """Recompute rollup rows from ``attendance`` for ``dates`` (all dates if None).
+
+    Does not commit; callers fold this into their own transaction. On
+    PostgreSQL this costs one extra statement to lock the rows first.
+    """
+    if dates is not None:
+        dates = set(dates)
+        if not dates:
+            return 0
+    _lock_rollup_rows(db, dates)
+
+    counts = (
+        select(
+            Attendance.date,
+            func.sum(case((Attendance.status == "Present", 1), else_=0)),
+            func.sum(case((Attendance.status == "Absent", 1), else_=0)),
+            func.count(Attendance.id),
+        )
+        .where(Attendance.date.in_(dates) if dates is not None else true())
+        .group_by(Attendance.date)
+    )
+    stmt = dialect_insert(db, DailyAttendanceRollup).from_select(
+        ["date", *ROLLUP_COUNTS], counts
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DailyAttendanceRollup.date],
+        set_={col: getattr(stmt.excluded, col) for col in ROLLUP_COUNTS},
+    )
+    refreshed = db.execute(stmt).rowcount
+
+    remaining = select(Attendance.id).where(
+        Attendance.date == DailyAttendanceRollup.date
+    )
+    stale = delete(DailyAttendanceRollup)
+    if dates is not None:
+        # Repeat the date list inside the subquery so a partitioned
+        # attendance table is pruned to those months, not anti-joined whole.
+        remaining = remaining.where(Attendance.date.in_(dates))
+        stale = stale.where(DailyAttendanceRollup.date.in_(dates))
+    stale = stale.where(~remaining.exists())
+    db.execute(stale)
+    return refreshed
+
+
+def get_daily_rollup(
+    db: Session, start: date, end: date
+) -> list[DailyAttendanceRollup]:
+    return list(
+        db.scalars(
+            select(DailyAttendanceRollup)
+            .where(
+                DailyAttendanceRollup.date >= start,
+                DailyAttendanceRollup.date <= end,
+            )
+            .order_by(DailyAttendanceRollup.date)
+        )
+    )
@@ -1,26 +1,353 @@
-from collections.abc import Generator
+import logging
+import time
+from collections.abc import AsyncGenerator, Callable, Generator
+from typing import Any, TypeVar
 
-from sqlalchemy import create_engine
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError, DisconnectionError
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 
 from app.config import settings
-
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
-    pool_recycle=300,
+from app.metrics import (
+    TimedAsyncAdaptedQueuePool,
+    TimedNullPool,
+    TimedQueuePool,
+    instrument_engine,
 )
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Clients echo this back on reads to be served by the primary until then.
+PRIMARY_UNTIL_HEADER = "X-Read-Primary-Until"
+
+
+# Every engine by role, for the pool diagnostics endpoint.
+engines: dict[str, Engine] = {}
+
+
+def _pool_options(queue_pool: type[QueuePool]) -> dict[str, Any]:
+    if settings.DB_POOL_STRATEGY == "null":
+        # An external pooler (pgbouncer) owns connection reuse.
+        return {"poolclass": TimedNullPool}
+    return {
+        "poolclass": queue_pool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _install_health_check(engine: Engine, interval: float) -> None:
+    """Ping a pooled connection on checkout only once it has idled ``interval``.
+
+    Replaces ``pool_pre_ping``'s round trip on every checkout: connections
+    returned to the pool recently are trusted, stale ones are checked, and
+    a failed ping makes the pool discard the connection and retry.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _connected(dbapi_connection, connection_record):
+        connection_record.info["verified_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkin")
+    def _checked_in(dbapi_connection, connection_record):
+        if dbapi_connection is not None:
+            connection_record.info["verified_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+        idle = time.monotonic() - connection_record.info.get("verified_at", 0.0)
+        if idle < interval:
+            return
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        except Exception as e:
+            raise DisconnectionError(f"Pooled connection failed health check: {e}")
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+        connection_record.info["verified_at"] = time.monotonic()
+
+
+def _register_engine(name: str, engine: Engine) -> None:
+    instrument_engine(engine)
+    if (
+        settings.DB_POOL_STRATEGY == "queue"
+        and not settings.DB_POOL_PRE_PING
+        and settings.DB_POOL_HEALTH_INTERVAL > 0
+    ):
+        _install_health_check(engine, settings.DB_POOL_HEALTH_INTERVAL)
+    engines[name] = engine
+
+
+def _enable_sqlite_foreign_keys(engine: Engine) -> None:
+    # Deleting an employee relies on the attendance FK's ON DELETE CASCADE,
+    # and marks for unknown employees on the FK violation.
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _connected(dbapi_connection, connection_record):
+        # A cursor works on both sqlite3 and the aiosqlite adapter.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def _create_engine(name: str, url: str):
+    engine = create_engine(
+        url,
+        # SQLite (local benchmarks) is used from threadpool workers.
+        connect_args=(
+            {"check_same_thread": False} if url.startswith("sqlite") else {}
+        ),
+        **_pool_options(TimedQueuePool),
+    )
+    _enable_sqlite_foreign_keys(engine)
+    _register_engine(name, engine)
+    return engine
+
+
+engine = _create_engine("primary", settings.DATABASE_URL)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+replica_engine = None
+ReplicaSessionLocal = None
+if settings.READ_REPLICA_URL:
+    replica_engine = _create_engine("replica", settings.READ_REPLICA_URL)
+    ReplicaSessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=replica_engine,
+        info={"replica": True},
+    )
+
 Base = declarative_base()
 
 
+def _async_url(url: str):
+    """Translate a sync DATABASE_URL to its asyncio driver equivalent."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite")
+    parsed = parsed.set(drivername="postgresql+asyncpg")
+    sslmode = parsed.query.get("sslmode")
+    if sslmode:
+        # asyncpg spells libpq's ``sslmode`` as ``ssl``.
+        parsed = parsed.difference_update_query(["sslmode"]).update_query_dict(
+            {"ssl": sslmode}
+        )
+    return parsed
+
+
+def _create_async_engine(name: str, url: str):
+    engine = create_async_engine(
+        _async_url(url), **_pool_options(TimedAsyncAdaptedQueuePool)
+    )
+    _enable_sqlite_foreign_keys(engine.sync_engine)
+    _register_engine(name, engine.sync_engine)
+    return engine
+
+
+async_engine = None
+AsyncSessionLocal = None
+AsyncReplicaSessionLocal = None
+if settings.ASYNC_DB:
+    async_engine = _create_async_engine("async_primary", settings.DATABASE_URL)
+    # Objects must stay loaded after commit: touching an expired attribute
+    # outside ``run_sync`` would need implicit IO, which asyncio forbids.
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+    if settings.READ_REPLICA_URL:
+        AsyncReplicaSessionLocal = async_sessionmaker(
+            _create_async_engine("async_replica", settings.READ_REPLICA_URL),
+            autoflush=False,
+            expire_on_commit=False,
+            info={"replica": True},
+        )
+
+DBSession = Session | AsyncSession
+
+
 def get_db() -> Generator[Session, None, None]:
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+get_session = get_async_db if settings.ASYNC_DB else get_db
+
+
+class ReplicaHealth:
+    """Passive circuit breaker: a failed connect benches the replica.
+
+    While benched, reads go to the primary; after REPLICA_RETRY_SECONDS the
+    next read tries the replica again.
+    """
+
+    def __init__(self, retry_after: float) -> None:
+        self.retry_after = retry_after
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._down_until
+
+    def mark_down(self, exc: Exception) -> None:
+        logger.warning(
+            "Read replica unavailable, using the primary for %.0fs: %s",
+            self.retry_after,
+            exc,
+        )
+        self._down_until = time.monotonic() + self.retry_after
+
+
+replica_health = ReplicaHealth(settings.REPLICA_RETRY_SECONDS)
+
+
+def _use_replica(request: Request | None) -> bool:
+    if not replica_health.available:
+        return False
+    if request is None:
+        return True
+    # Read-your-writes: a client that just wrote stays on the primary until
+    # the deadline handed out with its write response.
+    try:
+        return float(request.headers.get(PRIMARY_UNTIL_HEADER, 0)) <= time.time()
+    except ValueError:
+        return True
+
+
+def reads_replica(db: DBSession) -> bool:
+    """Whether ``db`` reads from the replica.
+
+    Replica data may predate a write that already invalidated the shared
+    caches and bumped the ETag versions, so it must not refill the former
+    or be tagged with the latter.
+    """
+    return db.info.get("replica", False)
+
+
+def _mark_replica_read(request: Request | None) -> None:
+    # Tells the add_cache_validators middleware in app.main not to tag
+    # the response.
+    if request is not None:
+        request.state.read_from_replica = True
+
+
+def open_read_session(request: Request | None = None) -> Session:
+    """A session on the replica when usable, otherwise on the primary."""
+    if ReplicaSessionLocal is not None and _use_replica(request):
+        db = ReplicaSessionLocal()
+        try:
+            # Check out a connection now so an unreachable replica falls
+            # back here rather than failing the request's first query.
+            db.connection()
+            _mark_replica_read(request)
+            return db
+        except (DBAPIError, OSError) as e:
+            db.close()
+            replica_health.mark_down(e)
+    return SessionLocal()
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    db = open_read_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    db = None
+    if AsyncReplicaSessionLocal is not None and _use_replica(request):
+        db = AsyncReplicaSessionLocal()
+        try:
+            await db.connection()
+            _mark_replica_read(request)
+        except (DBAPIError, OSError) as e:
+            await db.close()
+            replica_health.mark_down(e)
+            db = None
+    if db is None:
+        db = AsyncSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+# GET routes depend on this; writes keep using get_session (the primary).
+get_read_session = get_async_read_db if settings.ASYNC_DB else get_read_db
+
+
+async def run_db(
+    db: DBSession, fn: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """Run a sync CRUD function without blocking the event loop.
+
+    With an ``AsyncSession`` the function runs through ``run_sync`` on the
+    async driver; with a plain ``Session`` it runs in the threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+def pool_status() -> dict[str, dict[str, Any]]:
+    """Snapshot of every engine's pool for the diagnostics endpoint."""
+    report = {}
+    for name, engine in engines.items():
+        pool = engine.pool
+        checkouts = getattr(pool, "checkouts", 0)
+        status = {
+            "strategy": settings.DB_POOL_STRATEGY,
+            "pool_class": type(pool).__name__,
+            "checkouts": checkouts,
+            "wait_seconds_avg": (
+                round(pool.wait_seconds_total / checkouts, 6) if checkouts else 0.0
+            ),
+            "wait_seconds_max": round(getattr(pool, "wait_seconds_max", 0.0), 6),
+        }
+        if isinstance(pool, QueuePool):
+            status.update(
+                size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                # QueuePool counts from -size; only connections beyond the
+                # configured size are overflow.
+                overflow=max(pool.overflow(), 0),
+                max_overflow=settings.DB_MAX_OVERFLOW,
+            )
+        report[name] = status
+    return report
+
+
+def dialect_insert(db: Session, table):
+    """Return an INSERT supporting ON CONFLICT for the session's dialect."""
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(table)
+    return postgresql.insert(table)
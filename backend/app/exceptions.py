@@ -24,3 +24,30 @@ class ValidationError(Exception):
     def __init__(self, message: str) -> None:
         self.message = message
         super().__init__(message)
+
+
+class PunchQueueFullError(Exception):
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        super().__init__(
+            f"Attendance queue is full ({maxsize} pending marks); retry shortly"
+        )
+
+
+class PunchCommitTimeoutError(Exception):
+    def __init__(self, timeout: float) -> None:
+        self.timeout = timeout
+        super().__init__(
+            f"Attendance mark not committed within {timeout:g}s; it may still be "
+            "written, retry shortly"
+        )
+
+
+class QueryBudgetExceededError(Exception):
+    def __init__(self, route: str, budget: int, count: int) -> None:
+        self.route = route
+        self.budget = budget
+        self.count = count
+        super().__init__(
+            f"Query budget exceeded on {route}: {count} statements (budget {budget})"
+        )
@@ -1,20 +1,31 @@
+import asyncio
 import logging
+import time
 import traceback
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 
 from app.config import settings
-from app.database import engine, Base
+from app.database import PRIMARY_UNTIL_HEADER, pool_status
+from app.metrics import (
+    REQUEST_DB_QUERIES,
+    REQUEST_DB_TIME,
+    REQUEST_LATENCY,
+    REQUESTS_IN_FLIGHT,
+    RequestDBStats,
+    render_metrics,
+    request_db_stats,
+)
+from app.partitions import maintain_partitions
+from app.punch_queue import punch_queue
 from app.routers.employees import router as employees_router
 from app.routers.attendance import router as attendance_router
 from app.routers.dashboard import router as dashboard_router
 
-import app.models  # noqa: F401 — ensure models are registered before create_all
-
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
@@ -24,14 +35,23 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
+    if settings.PUNCH_QUEUE_ENABLED:
+        await punch_queue.start()
+    partition_task = None
+    if settings.ATTENDANCE_PARTITIONING:
+        partition_task = asyncio.create_task(maintain_partitions())
     yield
+    if partition_task is not None:
+        partition_task.cancel()
+    # Drain queued marks before the process exits.
+    await punch_queue.stop()
 
 
 app = FastAPI(
     title="HRMS Lite API",
     description="API for managing employee records and tracking attendance",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
@@ -41,13 +61,81 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[PRIMARY_UNTIL_HEADER],
 )
 
 
 @app.middleware("http")
-async def log_requests(request: Request, call_next):
-    logger.info("%s %s", request.method, request.url.path)
+async def record_metrics(request: Request, call_next):
+    stats = RequestDBStats(route=f"{request.method} {request.url.path}")
+    token = request_db_stats.set(stats)
+    REQUESTS_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        if settings.QUERY_COUNT_HEADER:
+            response.headers["X-Query-Count"] = str(stats.queries)
+            if stats.budget is not None:
+                response.headers["X-Query-Budget"] = str(stats.budget)
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        REQUESTS_IN_FLIGHT.dec()
+        request_db_stats.reset(token)
+        # Label by route template, not raw path, to keep cardinality bounded.
+        route = request.scope.get("route")
+        path = route.path if route is not None else "unmatched"
+        REQUEST_LATENCY.observe(elapsed, request.method, path, str(status_code))
+        REQUEST_DB_TIME.observe(stats.seconds, request.method, path)
+        REQUEST_DB_QUERIES.observe(stats.queries, request.method, path)
+        if stats.over_budget and settings.QUERY_BUDGET_MODE != "off":
+            logger.warning(
+                "Query budget exceeded on %s: %d statements (budget %d)",
+                stats.route,
+                stats.queries,
+                stats.budget,
+            )
+        logger.info(
+            "%s %s %d %.1fms (%d queries, %.1fms db)",
+            request.method,
+            request.url.path,
+            status_code,
+            elapsed * 1000,
+            stats.queries,
+            stats.seconds * 1000,
+        )
+
+
+@app.middleware("http")
+async def add_cache_validators(request: Request, call_next):
+    # Tags are computed by app.conditional.conditional_get before the handler.
     response = await call_next(request)
+    etag = getattr(request.state, "etag", None)
+    # Versions count writes seen by the primary; a replica read may predate
+    # them, so its body must not carry the current tag.
+    if getattr(request.state, "read_from_replica", False):
+        etag = None
+    if etag is not None and response.status_code == 200:
+        response.headers["ETag"] = etag
+        response.headers["Last-Modified"] = request.state.last_modified
+        response.headers.setdefault("Cache-Control", "no-cache")
+    return response
+
+
+@app.middleware("http")
+async def pin_reads_after_writes(request: Request, call_next):
+    # Hand writers a deadline to echo on reads so they are served by the
+    # primary until the replica has caught up (see app.database).
+    response = await call_next(request)
+    if (
+        settings.READ_REPLICA_URL
+        and request.method not in ("GET", "HEAD", "OPTIONS")
+        and response.status_code < 400
+    ):
+        until = time.time() + settings.REPLICA_STICKY_SECONDS
+        response.headers[PRIMARY_UNTIL_HEADER] = f"{until:.3f}"
     return response
 
 
@@ -86,3 +174,15 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/pool", include_in_schema=False)
+def pool_health():
+    return pool_status()
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4"
+    )
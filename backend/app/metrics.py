@@ -0,0 +1,260 @@
+"""In-process request and database metrics rendered in Prometheus text format.
+
+Collection is a dict lookup, a bisect and a few additions under a lock per
+observation, cheap enough to leave on for every request and statement.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.cache import CACHES
+from app.config import settings
+from app.exceptions import QueryBudgetExceededError
+from app.slow_queries import log_if_slow
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        buckets: tuple[float, ...],
+        labelnames: tuple[str, ...] = (),
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.labelnames = labelnames
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(k, list(v[0]), v[1]) for k, v in self._series.items()]
+        for labels, counts, total in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {total}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: int = 1) -> None:
+        self.inc(-amount)
+
+    def render(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {self._value}",
+        ]
+
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route.",
+    LATENCY_BUCKETS,
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled."
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per request.",
+    LATENCY_BUCKETS,
+    ("method", "route"),
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    COUNT_BUCKETS,
+    ("method", "route"),
+)
+DB_QUERY_TIME = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time.", QUERY_BUCKETS
+)
+POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    QUERY_BUCKETS,
+)
+
+PUNCH_QUEUE_DEPTH = Gauge(
+    "punch_queue_depth", "Attendance marks waiting in the write-behind queue."
+)
+PUNCH_FLUSH_ROWS = Histogram(
+    "punch_queue_flush_rows",
+    "Attendance marks written per write-behind group commit.",
+    (1, 10, 50, 100, 250, 500, 1000, 2500),
+)
+
+REGISTRY = [
+    REQUEST_LATENCY,
+    REQUESTS_IN_FLIGHT,
+    REQUEST_DB_TIME,
+    REQUEST_DB_QUERIES,
+    DB_QUERY_TIME,
+    POOL_CHECKOUT_WAIT,
+    PUNCH_QUEUE_DEPTH,
+    PUNCH_FLUSH_ROWS,
+]
+
+
+@dataclass
+class RequestDBStats:
+    queries: int = 0
+    seconds: float = 0.0
+    budget: int | None = None
+    route: str = ""
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.queries > self.budget
+
+
+request_db_stats: ContextVar[RequestDBStats | None] = ContextVar(
+    "request_db_stats", default=None
+)
+
+
+def query_budget(limit: int):
+    """Route dependency declaring how many SQL statements a request may run.
+
+    Exceeding it raises QueryBudgetExceededError from the offending statement
+    when QUERY_BUDGET_MODE is "raise" (tests and benchmarks), and is logged
+    by the metrics middleware when it is "warn".
+    """
+
+    async def _declare_budget(request: Request) -> None:
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.budget = limit
+            route = request.scope.get("route")
+            stats.route = f"{request.method} {route.path if route else request.url.path}"
+
+    return _declare_budget
+
+
+def _render_caches() -> list[str]:
+    lines = []
+    for metric, attr, kind, help in (
+        ("cache_hits_total", "hits", "counter", "Cache lookups that found a live entry."),
+        ("cache_misses_total", "misses", "counter", "Cache lookups that found nothing or an expired entry."),
+        ("cache_evictions_total", "evictions", "counter", "Entries evicted to stay within maxsize."),
+        ("cache_entries", "__len__", "gauge", "Entries currently cached."),
+    ):
+        lines += [f"# HELP {metric} {help}", f"# TYPE {metric} {kind}"]
+        for name, cache in CACHES.items():
+            value = len(cache) if attr == "__len__" else getattr(cache, attr)
+            lines.append(f'{metric}{{cache="{name}"}} {value}')
+    return lines
+
+
+def render_metrics() -> str:
+    lines: list[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    lines.extend(_render_caches())
+    return "\n".join(lines) + "\n"
+
+
+class _TimedCheckout:
+    """Pool mixin recording checkout wait, globally and per pool instance."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._wait_lock = threading.Lock()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            waited = time.perf_counter() - started
+            POOL_CHECKOUT_WAIT.observe(waited)
+            with self._wait_lock:
+                self.checkouts += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    """QueuePool that records how long each checkout waits."""
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waits."""
+
+
+class TimedNullPool(_TimedCheckout, NullPool):
+    """NullPool that records checkout time, which here is connect time."""
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement, attribute it to the current request and log it if slow."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            if stats.over_budget and settings.QUERY_BUDGET_MODE == "raise":
+                raise QueryBudgetExceededError(stats.route, stats.budget, stats.queries)
+        context._query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        DB_QUERY_TIME.observe(elapsed)
+        stats = request_db_stats.get()
+        if stats is not None:
+            stats.seconds += elapsed
+        log_if_slow(conn, statement, parameters, elapsed, stats.route if stats else None)
@@ -1,4 +1,5 @@
 from app.models.employee import Employee
 from app.models.attendance import Attendance
+from app.models.rollup import DailyAttendanceRollup
 
-__all__ = ["Employee", "Attendance"]
+__all__ = ["Employee", "Attendance", "DailyAttendanceRollup"]
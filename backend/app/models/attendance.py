@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -10,8 +10,13 @@ class Attendance(Base):
 
     __table_args__ = (
         UniqueConstraint("employee_id", "date", name="uq_employee_date"),
+        # Serves date-only lookups (roster, calendar ranges) as well as
+        # (date, status) counts, since date is the leading column.
+        Index("ix_attendance_date_status", "date", "status"),
     )
 
+    # On databases converted by ``manage.py partition-attendance`` the
+    # primary key is (id, date); ids remain unique (see app.partitions).
     id = Column(Integer, primary_key=True, autoincrement=True)
     employee_id = Column(
         String(20),
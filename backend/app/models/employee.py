@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -8,6 +8,10 @@ from app.database import Base
 class Employee(Base):
     __tablename__ = "employees"
 
+    __table_args__ = (
+        Index("ix_employees_created_at_id", "created_at", "id"),
+    )
+
     id = Column(Integer, primary_key=True, autoincrement=True)
     employee_id = Column(String(20), unique=True, nullable=False, index=True)
     full_name = Column(String(100), nullable=False)
@@ -17,5 +21,10 @@ class Employee(Base):
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     attendance_records = relationship(
-        "Attendance", back_populates="employee", cascade="all, delete-orphan"
+        "Attendance",
+        back_populates="employee",
+        cascade="all, delete-orphan",
+        # Let ON DELETE CASCADE remove attendance rather than loading and
+        # deleting every row through the ORM.
+        passive_deletes=True,
     )
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, Date
+
+from app.database import Base
+
+
+class DailyAttendanceRollup(Base):
+    __tablename__ = "daily_attendance_rollup"
+
+    date = Column(Date, primary_key=True)
+    present = Column(Integer, nullable=False, default=0, server_default="0")
+    absent = Column(Integer, nullable=False, default=0, server_default="0")
+    # Number of employees with an attendance record on this date.
+    headcount = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,236 @@
+"""Optional monthly range partitioning of ``attendance`` (PostgreSQL only).
+
+``python manage.py partition-attendance`` converts the table once. After
+that, ``ensure_partitions`` keeps ATTENDANCE_PARTITIONS_AHEAD months of
+partitions ready. It runs at startup and then daily when
+ATTENDANCE_PARTITIONING is on, or from cron via
+``python manage.py ensure-partitions``.
+
+Rows for a month that has no partition yet land in ``attendance_default``.
+They are moved out when that month's partition is created.
+
+The partitioned table keeps ``uq_employee_date`` and the employee FK with
+ON DELETE CASCADE. Its primary key becomes (id, date), because PostgreSQL
+requires unique constraints on a partitioned table to include the
+partition key. ids still come from the original sequence, so they stay
+unique.
+"""
+
+import asyncio
+import logging
+from datetime import date
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.config import settings
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARTITION = "attendance_default"
+MAINTENANCE_INTERVAL_SECONDS = 24 * 60 * 60
+# Serializes partition DDL across workers that start at the same time.
+_ADVISORY_LOCK_KEY = 0x61747464  # "attd"
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _add_months(month: date, count: int) -> date:
+    for _ in range(count):
+        month = _next_month(month)
+    return month
+
+
+def partition_name(month: date) -> str:
+    return f"attendance_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    if conn.dialect.name != "postgresql":
+        return False
+    return conn.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = 'attendance' AND pg_table_is_visible(c.oid))"
+        )
+    ).scalar()
+
+
+def _existing_partitions(conn: Connection) -> set[str]:
+    return set(
+        conn.scalars(
+            text(
+                "SELECT child.relname FROM pg_inherits i "
+                "JOIN pg_class parent ON parent.oid = i.inhparent "
+                "JOIN pg_class child ON child.oid = i.inhrelid "
+                "WHERE parent.relname = 'attendance' AND parent.relkind = 'p' "
+                "AND pg_table_is_visible(parent.oid)"
+            )
+        )
+    )
+
+
+def _create_month_partition(conn: Connection, month: date, parent: str) -> str:
+    name = partition_name(month)
+    conn.execute(
+        text(
+            f"CREATE TABLE {name} PARTITION OF {parent} "
+            f"FOR VALUES FROM ('{month.isoformat()}') "
+            f"TO ('{_next_month(month).isoformat()}')"
+        )
+    )
+    return name
+
+
+def _attach_month_partition(conn: Connection, month: date) -> str:
+    """Create ``month``'s partition, moving any of its rows out of the default.
+
+    A partition cannot be created while the default partition holds rows
+    in its range, so it is built detached, filled from the default, and
+    then attached, all in the caller's transaction.
+    """
+    name = partition_name(month)
+    bounds = {"lo": month, "hi": _next_month(month)}
+    conn.execute(text(f"CREATE TABLE {name} (LIKE attendance INCLUDING DEFAULTS)"))
+    conn.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE date >= :lo AND date < :hi "
+            "RETURNING id, employee_id, date, status, created_at) "
+            f"INSERT INTO {name} (id, employee_id, date, status, created_at) "
+            "SELECT id, employee_id, date, status, created_at FROM moved"
+        ),
+        bounds,
+    )
+    conn.execute(
+        text(
+            f"ALTER TABLE attendance ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['lo'].isoformat()}') "
+            f"TO ('{bounds['hi'].isoformat()}')"
+        )
+    )
+    return name
+
+
+def ensure_partitions(
+    conn: Connection, months_ahead: int, today: date | None = None
+) -> list[str]:
+    """Create any missing partitions and return their names.
+
+    Covers the current month plus ``months_ahead``, and every month that
+    already has rows sitting in the default partition.
+    """
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+    current = (today or date.today()).replace(day=1)
+    months = {_add_months(current, n) for n in range(months_ahead + 1)}
+    months.update(
+        conn.scalars(
+            text(
+                "SELECT DISTINCT date_trunc('month', date)::date "
+                f"FROM {DEFAULT_PARTITION}"
+            )
+        )
+    )
+    existing = _existing_partitions(conn)
+    return [
+        _attach_month_partition(conn, month)
+        for month in sorted(months)
+        if partition_name(month) not in existing
+    ]
+
+
+def partition_attendance(
+    conn: Connection, months_ahead: int, today: date | None = None
+) -> list[str]:
+    """Rebuild ``attendance`` as a table range-partitioned by month.
+
+    Runs in the caller's transaction and holds an ACCESS EXCLUSIVE lock on
+    ``attendance`` for the copy, so run it in a maintenance window.
+    """
+    if conn.dialect.name != "postgresql":
+        raise RuntimeError("Attendance partitioning requires PostgreSQL")
+    if is_partitioned(conn):
+        raise RuntimeError("attendance is already partitioned")
+
+    conn.execute(text("LOCK TABLE attendance IN ACCESS EXCLUSIVE MODE"))
+    sequence = conn.execute(
+        text("SELECT pg_get_serial_sequence('attendance', 'id')")
+    ).scalar()
+    first, last = conn.execute(text("SELECT min(date), max(date) FROM attendance")).one()
+
+    # Keep the id sequence alive when the old table is dropped.
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    conn.execute(
+        text(
+            "CREATE TABLE attendance_partitioned ("
+            f"id integer NOT NULL DEFAULT nextval('{sequence}'::regclass), "
+            "employee_id varchar(20) NOT NULL, "
+            "date date NOT NULL, "
+            "status varchar(10) NOT NULL, "
+            "created_at timestamp without time zone DEFAULT now()"
+            ") PARTITION BY RANGE (date)"
+        )
+    )
+    conn.execute(
+        text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF attendance_partitioned DEFAULT")
+    )
+
+    current = (today or date.today()).replace(day=1)
+    month = min(first.replace(day=1), current) if first else current
+    end = max(last.replace(day=1), current) if last else current
+    end = max(end, _add_months(current, months_ahead))
+    created = []
+    while month <= end:
+        created.append(_create_month_partition(conn, month, "attendance_partitioned"))
+        month = _next_month(month)
+
+    conn.execute(
+        text(
+            "INSERT INTO attendance_partitioned (id, employee_id, date, status, created_at) "
+            "SELECT id, employee_id, date, status, created_at FROM attendance"
+        )
+    )
+    conn.execute(text("DROP TABLE attendance"))
+    conn.execute(text("ALTER TABLE attendance_partitioned RENAME TO attendance"))
+    conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY attendance.id"))
+
+    # Constraints and indexes go on after the copy; each is created on every
+    # partition and inherited by partitions created later.
+    for ddl in (
+        "ALTER TABLE attendance ADD CONSTRAINT attendance_pkey PRIMARY KEY (id, date)",
+        "ALTER TABLE attendance ADD CONSTRAINT uq_employee_date UNIQUE (employee_id, date)",
+        "ALTER TABLE attendance ADD CONSTRAINT attendance_employee_id_fkey "
+        "FOREIGN KEY (employee_id) REFERENCES employees (employee_id) ON DELETE CASCADE",
+        "CREATE INDEX ix_attendance_employee_id ON attendance (employee_id)",
+        "CREATE INDEX ix_attendance_date_status ON attendance (date, status)",
+    ):
+        conn.execute(text(ddl))
+    return created
+
+
+def _ensure_partitions_now() -> list[str]:
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            logger.warning(
+                "ATTENDANCE_PARTITIONING is on but attendance is not partitioned; "
+                "run `python manage.py partition-attendance` first"
+            )
+            return []
+        return ensure_partitions(conn, settings.ATTENDANCE_PARTITIONS_AHEAD)
+
+
+async def maintain_partitions() -> None:
+    """Background task: create upcoming partitions at startup, then daily."""
+    while True:
+        try:
+            created = await run_in_threadpool(_ensure_partitions_now)
+            if created:
+                logger.info("Created attendance partitions: %s", ", ".join(created))
+        except Exception:
+            logger.exception("Attendance partition maintenance failed")
+        await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
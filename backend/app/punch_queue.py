@@ -0,0 +1,393 @@
+"""Write-behind queue that group-commits single attendance marks.
+
+With PUNCH_QUEUE_ENABLED, ``PUT /api/attendance/`` validates a mark and puts
+it on a bounded in-process queue instead of committing it itself. A
+background task drains the queue every PUNCH_FLUSH_INTERVAL_MS or
+PUNCH_FLUSH_MAX_ROWS marks, whichever comes first, and writes each batch
+with ``bulk_upsert_attendance`` in one transaction.
+
+Callers acknowledged on enqueue (202) are only answered once their mark is
+fsync'd to a spool segment in PUNCH_SPOOL_DIR. Each flush starts a new
+segment, and a segment is deleted as soon as every mark in it is settled, so
+only uncommitted marks survive a crash. Every process holds an exclusive
+lock on its own segments; at startup a process replays the segments whose
+owner is gone, which lets several workers share one directory.
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Row
+from sqlalchemy.exc import DisconnectionError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config import settings
+from app.crud.attendance import bulk_upsert_attendance
+from app.database import SessionLocal
+from app.exceptions import (
+    EmployeeNotFoundError,
+    PunchCommitTimeoutError,
+    PunchQueueFullError,
+)
+from app.metrics import PUNCH_FLUSH_ROWS, PUNCH_QUEUE_DEPTH
+from app.schemas.attendance import AttendanceCreate
+
+logger = logging.getLogger(__name__)
+
+# Connection-level failures that a later attempt can succeed past; anything
+# else raised while writing a single row is a problem with that row.
+TRANSIENT_ERRORS = (OperationalError, DisconnectionError, PoolTimeoutError, OSError)
+RETRY_BACKOFF_MIN = 0.1
+RETRY_BACKOFF_MAX = 30.0
+SHUTDOWN_TIMEOUT = 30.0
+
+
+class _Segment:
+    """One locked spool file and the number of its marks not yet settled."""
+
+    def __init__(self, path: str, fd: int) -> None:
+        self.path = path
+        self.file = os.fdopen(fd, "a", encoding="utf-8")
+        self.pending = 0
+        self.marks = 0
+
+    def remove(self) -> None:
+        # Unlink while still holding the lock so no other process can claim
+        # the file in between.
+        os.unlink(self.path)
+        self.file.close()
+
+
+@dataclass
+class _Punch:
+    data: AttendanceCreate
+    # None when the caller was acknowledged on enqueue and is not waiting.
+    result: asyncio.Future | None = None
+    # The spool segment holding this mark until it is settled.
+    segment: _Segment | None = None
+
+
+class PunchSpool:
+    """Directory of NDJSON segments holding acknowledged, unsettled marks."""
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._active: _Segment | None = None
+        self._segments: set[_Segment] = set()
+
+    def _lock_file(self, path: str, flags: int) -> int | None:
+        try:
+            fd = os.open(path, flags, 0o644)
+        except FileNotFoundError:
+            return None
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        if os.fstat(fd).st_nlink == 0:
+            # Settled and unlinked by its owner after we opened it.
+            os.close(fd)
+            return None
+        return fd
+
+    def _new_segment(self) -> _Segment:
+        name = f"{os.getpid()}-{time.time_ns()}.ndjson"
+        # Created under a hidden name and locked before it becomes visible,
+        # so a worker starting up never mistakes it for an orphan.
+        hidden = os.path.join(self.directory, "." + name)
+        fd = self._lock_file(hidden, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+        path = os.path.join(self.directory, name)
+        os.rename(hidden, path)
+        return self._track(_Segment(path, fd))
+
+    def _track(self, segment: _Segment) -> _Segment:
+        self._segments.add(segment)
+        return segment
+
+    def _remove(self, segment: _Segment) -> None:
+        self._segments.discard(segment)
+        segment.remove()
+
+    def open(self) -> list[tuple[_Segment, AttendanceCreate]]:
+        """Claim orphaned segments and return the marks they still hold."""
+        os.makedirs(self.directory, exist_ok=True)
+        leftover = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.startswith(".") or not name.endswith(".ndjson"):
+                continue
+            path = os.path.join(self.directory, name)
+            fd = self._lock_file(path, os.O_RDWR)
+            if fd is None:
+                continue  # Owned by a live process.
+            segment = self._track(_Segment(path, fd))
+            with open(path, encoding="utf-8") as f:
+                for number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        leftover.append(
+                            (segment, AttendanceCreate.model_validate_json(line))
+                        )
+                    except ValueError:
+                        logger.error(
+                            "Skipping unreadable line %d of %s: %r", number, path, line
+                        )
+                        continue
+                    segment.pending += 1
+            if not segment.pending:
+                self._remove(segment)
+        self._active = self._new_segment()
+        return leftover
+
+    def append(self, data: AttendanceCreate) -> _Segment:
+        line = json.dumps(data.model_dump(mode="json")) + "\n"
+        with self._lock:
+            segment = self._active
+            segment.file.write(line)
+            segment.file.flush()
+            os.fsync(segment.file.fileno())
+            segment.pending += 1
+            segment.marks += 1
+            return segment
+
+    def rotate(self) -> None:
+        """Send new marks to a fresh segment so the current one can drain."""
+        with self._lock:
+            if not self._active.marks:
+                return
+            previous, self._active = self._active, self._new_segment()
+            if not previous.pending:
+                self._remove(previous)
+
+    def release(self, segments: list[_Segment]) -> None:
+        """Settle one mark per entry; delete drained, inactive segments."""
+        with self._lock:
+            for segment in segments:
+                segment.pending -= 1
+                if not segment.pending and segment is not self._active:
+                    self._remove(segment)
+
+    def close(self) -> None:
+        """Delete drained segments and unlock the rest for the next start."""
+        with self._lock:
+            for segment in list(self._segments):
+                if segment.pending:
+                    segment.file.close()
+                else:
+                    segment.remove()
+            self._segments.clear()
+            self._active = None
+
+
+def _write_batch(records: list[AttendanceCreate]):
+    with SessionLocal() as db:
+        return bulk_upsert_attendance(db, records)
+
+
+class PunchQueue:
+    def __init__(
+        self,
+        maxsize: int,
+        flush_interval: float,
+        flush_max_rows: int,
+        enqueue_timeout: float,
+        commit_timeout: float,
+        spool_dir: str,
+    ) -> None:
+        self.maxsize = maxsize
+        self.flush_interval = flush_interval
+        self.flush_max_rows = flush_max_rows
+        self.enqueue_timeout = enqueue_timeout
+        self.commit_timeout = commit_timeout
+        self.spool = PunchSpool(spool_dir)
+        self._queue: asyncio.Queue[_Punch | None] | None = None
+        # Capacity is reserved before a mark is spooled, so a caller turned
+        # away with a 503 never leaves a mark behind in the spool.
+        self._slots: asyncio.Semaphore | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.maxsize)
+        leftover = await run_in_threadpool(self.spool.open)
+        self._task = asyncio.create_task(self._run())
+        if leftover:
+            logger.info("Replaying %d spooled attendance marks", len(leftover))
+        for segment, data in leftover:
+            await self._slots.acquire()
+            self._enqueue(_Punch(data, segment=segment))
+
+    async def stop(self) -> None:
+        """Flush everything already queued, then stop the background task.
+
+        If the database stays unreachable past SHUTDOWN_TIMEOUT the task is
+        cancelled; acknowledged marks are still in the spool for next start.
+        """
+        if not self.running:
+            return
+        self._queue.put_nowait(None)
+        try:
+            await asyncio.wait_for(self._task, timeout=SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.error(
+                "Punch queue did not drain in %.0fs; spooled marks will be replayed",
+                SHUTDOWN_TIMEOUT,
+            )
+        self._task = None
+        self.spool.close()
+
+    async def submit(self, data: AttendanceCreate, wait: bool) -> Row | None:
+        """Queue a mark; with ``wait`` return its row once it is committed.
+
+        A full queue makes the caller wait for room for up to
+        PUNCH_ENQUEUE_TIMEOUT seconds before raising PunchQueueFullError, so
+        producers slow down to the flush rate rather than dropping marks.
+        Without ``wait`` the mark is spooled to disk before returning. With
+        it, a mark not committed within PUNCH_COMMIT_TIMEOUT seconds (e.g.
+        while the database is down) raises PunchCommitTimeoutError; the mark
+        stays queued and may still be written.
+        """
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            raise PunchQueueFullError(self.maxsize)
+
+        if not wait:
+            try:
+                segment = await run_in_threadpool(self.spool.append, data)
+            except Exception:
+                self._slots.release()
+                raise
+            self._enqueue(_Punch(data, segment=segment))
+            return None
+
+        punch = _Punch(data, asyncio.get_running_loop().create_future())
+        self._enqueue(punch)
+        try:
+            return await asyncio.wait_for(punch.result, timeout=self.commit_timeout)
+        except asyncio.TimeoutError:
+            # Nobody is waiting any more; a later rejection is logged instead.
+            punch.result = None
+            raise PunchCommitTimeoutError(self.commit_timeout)
+
+    def _enqueue(self, punch: _Punch) -> None:
+        self._queue.put_nowait(punch)
+        PUNCH_QUEUE_DEPTH.inc()
+
+    async def _next(self, timeout: float | None = None) -> _Punch | None:
+        if timeout is None:
+            punch = await self._queue.get()
+        else:
+            punch = await asyncio.wait_for(self._queue.get(), timeout)
+        if punch is not None:
+            self._slots.release()
+        return punch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._next()
+            if first is None:
+                break
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.flush_max_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    punch = await self._next(timeout)
+                except asyncio.TimeoutError:
+                    break
+                if punch is None:
+                    stopping = True
+                    break
+                batch.append(punch)
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[_Punch]) -> None:
+        PUNCH_QUEUE_DEPTH.dec(len(batch))
+        PUNCH_FLUSH_ROWS.observe(len(batch))
+        await run_in_threadpool(self.spool.rotate)
+        try:
+            rows, errors = await run_in_threadpool(
+                _write_batch, [punch.data for punch in batch]
+            )
+        except Exception:
+            logger.exception(
+                "Group commit of %d marks failed; writing them one at a time",
+                len(batch),
+            )
+            for punch in batch:
+                await self._write_one(punch)
+        else:
+            self._settle(batch, rows)
+        await run_in_threadpool(
+            self.spool.release,
+            [punch.segment for punch in batch if punch.segment is not None],
+        )
+
+    async def _write_one(self, punch: _Punch) -> None:
+        """Write a single mark, retrying connection failures with backoff.
+
+        Only a failure specific to this row settles it as rejected; while the
+        database is unreachable the flusher keeps retrying, the queue fills
+        up and new callers are pushed back.
+        """
+        delay = RETRY_BACKOFF_MIN
+        while True:
+            try:
+                rows, _ = await run_in_threadpool(_write_batch, [punch.data])
+            except TRANSIENT_ERRORS as e:
+                logger.warning("Retrying queued mark in %.1fs: %s", delay, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RETRY_BACKOFF_MAX)
+                continue
+            except Exception as e:
+                self._reject(punch, e)
+                return
+            self._settle([punch], rows)
+            return
+
+    def _settle(self, batch: list[_Punch], rows: list[Row]) -> None:
+        # A mark superseded by a later one for the same day in the batch
+        # resolves to the row that was written.
+        written = {(row.employee_id, row.date): row for row in rows}
+        for punch in batch:
+            row = written.get((punch.data.employee_id, punch.data.date))
+            if row is None:
+                self._reject(punch, EmployeeNotFoundError(punch.data.employee_id))
+            elif punch.result is not None and not punch.result.done():
+                punch.result.set_result(row)
+
+    def _reject(self, punch: _Punch, error: Exception) -> None:
+        if punch.result is None:
+            logger.error(
+                "Rejected queued mark %s: %s", punch.data.model_dump(mode="json"), error
+            )
+        elif not punch.result.done():
+            punch.result.set_exception(error)
+
+
+punch_queue = PunchQueue(
+    maxsize=settings.PUNCH_QUEUE_MAX_SIZE,
+    flush_interval=settings.PUNCH_FLUSH_INTERVAL_MS / 1000,
+    flush_max_rows=settings.PUNCH_FLUSH_MAX_ROWS,
+    enqueue_timeout=settings.PUNCH_ENQUEUE_TIMEOUT,
+    commit_timeout=settings.PUNCH_COMMIT_TIMEOUT,
+    spool_dir=settings.PUNCH_SPOOL_DIR,
+)
@@ -1,40 +1,244 @@
+import codecs
+import csv
+import io
+import json
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
 from datetime import date
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import ValidationError as SchemaValidationError
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.cache import bitmap_cache
+from app.conditional import attendance_month_scopes, conditional_get
+from app.database import (
+    DBSession,
+    get_read_session,
+    get_session,
+    open_read_session,
+    reads_replica,
+    run_db,
+)
+from app.metrics import query_budget
+from app.punch_queue import punch_queue
 from app.schemas.attendance import (
     AttendanceCreate,
     AttendanceResponse,
     AttendanceListResponse,
+    AttendanceBitmapResponse,
     AttendanceSummary,
+    AttendanceSummaryListResponse,
+    AttendanceImportBatch,
+    AttendanceImportError,
+    AttendanceImportResponse,
+    AttendanceRangeCreate,
+    AttendanceRangeResponse,
     BulkAttendanceCreate,
     BulkAttendanceResponse,
     DateAttendanceResponse,
     MonthSummaryResponse,
 )
+from app.crud.employee import employee_exists
 from app.crud.attendance import (
     mark_attendance,
     upsert_attendance,
     bulk_upsert_attendance,
+    mark_attendance_range,
     get_attendance_by_employee,
     get_attendance_summary,
+    get_attendance_summaries,
     get_attendance_by_date,
     get_month_summary,
+    get_attendance_bitmaps,
+    iter_attendance_export,
+    EXPORT_COLUMNS,
 )
 from app.exceptions import (
     EmployeeNotFoundError,
     DuplicateAttendanceError,
+    PunchCommitTimeoutError,
+    PunchQueueFullError,
 )
 
 router = APIRouter(prefix="/api/attendance", tags=["Attendance"])
 
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_ERRORS_PER_BATCH = 50
+
+
+async def _iter_lines(request: Request) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+class _NeedMoreLines(Exception):
+    """Raised by _LineFeed when the reader wants a line that has not arrived."""
+
+
+class _LineFeed:
+    """Lines of the CSV record in progress, for a single csv.reader to pull.
+
+    The reader cannot pause mid-record, so when it asks for a line that has
+    not arrived yet the feed raises _NeedMoreLines and is rewound; the record
+    is parsed again from its first line once the next line is pushed.
+    """
+
+    def __init__(self) -> None:
+        self._lines: deque[str] = deque()
+        self._read = 0
+        self._ended = False
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._lines)
+
+    def push(self, line: str) -> None:
+        self._lines.append(line)
+
+    def end(self) -> None:
+        self._ended = True
+
+    def rewind(self) -> None:
+        self._read = 0
+
+    def consume(self) -> None:
+        """Drop the lines the reader used for the record it just returned."""
+        for _ in range(self._read):
+            self._lines.popleft()
+        self._read = 0
+
+    def __iter__(self) -> "_LineFeed":
+        return self
+
+    def __next__(self) -> str:
+        if self._read == len(self._lines):
+            if self._ended:
+                raise StopIteration
+            raise _NeedMoreLines
+        line = self._lines[self._read]
+        self._read += 1
+        return line
+
+
+async def _iter_csv_records(
+    lines: AsyncIterator[str],
+) -> AsyncIterator[tuple[int, int, list[str] | csv.Error]]:
+    """Yield ``(first_line, last_line, fields)`` for each CSV record.
+
+    One csv.reader parses the whole body, so it alone decides where a record
+    ends: quoted fields may span lines and a stray quote inside an unquoted
+    field stays literal. An unterminated quote buffers lines only until the
+    field exceeds csv.field_size_limit(), which the reader reports as an
+    error. A record the reader rejects is yielded as its csv.Error.
+    """
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    line_no = 0
+    first_line = 0
+    async for line in lines:
+        line_no += 1
+        if not feed.pending:
+            if not line.strip():
+                continue
+            first_line = line_no
+        feed.push(line + "\n")
+        try:
+            record = next(reader)
+        except _NeedMoreLines:
+            feed.rewind()
+            continue
+        except csv.Error as e:
+            record = e
+        feed.consume()
+        yield first_line, line_no, record
+    if feed.pending:
+        # The body ended inside a quoted field.
+        feed.end()
+        try:
+            record = next(reader)
+        except csv.Error as e:
+            record = e
+        yield first_line, line_no, record
+
+
+async def _iter_ndjson_records(
+    lines: AsyncIterator[str],
+) -> AsyncIterator[tuple[int, int, str]]:
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if line.strip():
+            yield line_no, line_no, line
+
+
+def _error_detail(exc: Exception) -> str:
+    if isinstance(exc, SchemaValidationError) and exc.errors():
+        first = exc.errors()[0]
+        field = " -> ".join(str(loc) for loc in first.get("loc", []))
+        msg = first.get("msg", "Invalid value")
+        return f"Field '{field}': {msg}" if field else msg
+    return str(exc)
+
 
-@router.post("/", response_model=AttendanceResponse, status_code=status.HTTP_201_CREATED)
-def mark(attendance_data: AttendanceCreate, db: Session = Depends(get_db)):
+async def _import_batch(
+    db: DBSession,
+    number: int,
+    first_line: int,
+    last_line: int,
+    rows: list[AttendanceCreate],
+    row_lines: list[int],
+    errors: list[AttendanceImportError],
+) -> AttendanceImportBatch:
+    success = 0
+    if rows:
+        try:
+            results, row_errors = await run_db(db, bulk_upsert_attendance, rows)
+        except SQLAlchemyError as e:
+            # Earlier batches are committed: report this one as failed and
+            # carry on with a clean session rather than losing the report.
+            await run_db(db, Session.rollback)
+            detail = f"Batch not written: {getattr(e, 'orig', None) or e}"
+            errors.extend(
+                AttendanceImportError(line=line, detail=detail) for line in row_lines
+            )
+        else:
+            success = len(results)
+            errors.extend(
+                AttendanceImportError(line=row_lines[e.index], detail=e.detail)
+                for e in row_errors
+            )
+    errors.sort(key=lambda e: e.line)
+    return AttendanceImportBatch(
+        batch=number,
+        first_line=first_line,
+        last_line=last_line,
+        success=success,
+        failed=len(errors),
+        errors=errors[:IMPORT_MAX_ERRORS_PER_BATCH],
+    )
+
+
+@router.post(
+    "/",
+    response_model=AttendanceResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(query_budget(2))],
+)
+async def mark(attendance_data: AttendanceCreate, db: DBSession = Depends(get_session)):
     try:
-        return mark_attendance(db, attendance_data)
+        return await run_db(db, mark_attendance, attendance_data)
     except EmployeeNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except DuplicateAttendanceError as e:
@@ -45,12 +249,37 @@ def mark(attendance_data: AttendanceCreate, db: Session = Depends(get_db)):
         )
 
 
-@router.put("/", response_model=AttendanceResponse)
-def upsert(attendance_data: AttendanceCreate, db: Session = Depends(get_db)):
+@router.put(
+    "/",
+    response_model=AttendanceResponse,
+    dependencies=[Depends(query_budget(5))],
+)
+async def upsert(
+    attendance_data: AttendanceCreate,
+    ack: Literal["flush", "enqueue"] = Query(default="flush"),
+    db: DBSession = Depends(get_session),
+):
     try:
-        return upsert_attendance(db, attendance_data)
+        if not punch_queue.running:
+            return await run_db(db, upsert_attendance, attendance_data)
+
+        if not await run_db(db, employee_exists, attendance_data.employee_id):
+            raise EmployeeNotFoundError(attendance_data.employee_id)
+        record = await punch_queue.submit(attendance_data, wait=ack == "flush")
+        if record is None:
+            return ORJSONResponse(
+                {"queued": True, **attendance_data.model_dump()},
+                status_code=status.HTTP_202_ACCEPTED,
+            )
+        return record
     except EmployeeNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except (PunchQueueFullError, PunchCommitTimeoutError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"},
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -58,13 +287,114 @@ def upsert(attendance_data: AttendanceCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/bulk", response_model=BulkAttendanceResponse)
-def bulk_mark(payload: BulkAttendanceCreate, db: Session = Depends(get_db)):
+async def bulk_mark(payload: BulkAttendanceCreate, db: DBSession = Depends(get_session)):
     try:
-        results, failed = bulk_upsert_attendance(db, payload.records)
+        results, errors = await run_db(db, bulk_upsert_attendance, payload.records)
         return BulkAttendanceResponse(
             success=len(results),
-            failed=failed,
+            failed=len(errors),
             results=results,
+            errors=errors,
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.post(
+    "/range",
+    response_model=AttendanceRangeResponse,
+    # Includes the PostgreSQL-only rollup row lock.
+    dependencies=[Depends(query_budget(5))],
+)
+async def mark_range(
+    payload: AttendanceRangeCreate, db: DBSession = Depends(get_session)
+):
+    try:
+        return await run_db(db, mark_attendance_range, payload)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.post("/import", response_model=AttendanceImportResponse)
+async def import_records(
+    request: Request,
+    format: Literal["csv", "ndjson"] | None = Query(default=None),
+    db: DBSession = Depends(get_session),
+):
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "json" in content_type else "csv"
+
+    batches: list[AttendanceImportBatch] = []
+    header: list[str] | None = None
+    rows: list[AttendanceCreate] = []
+    row_lines: list[int] = []
+    errors: list[AttendanceImportError] = []
+    pending = 0
+    total_rows = 0
+    first_line = 1
+    line_no = 0
+
+    if format == "csv":
+        records = _iter_csv_records(_iter_lines(request))
+    else:
+        records = _iter_ndjson_records(_iter_lines(request))
+
+    try:
+        async for record_line, line_no, record in records:
+            if format == "csv" and header is None:
+                if isinstance(record, csv.Error):
+                    raise record
+                header = [col.strip() for col in record]
+                first_line = line_no + 1
+                continue
+
+            pending += 1
+            total_rows += 1
+            try:
+                if isinstance(record, csv.Error):
+                    raise record
+                if format == "ndjson":
+                    raw = json.loads(record)
+                else:
+                    raw = dict(zip(header, record))
+                rows.append(AttendanceCreate.model_validate(raw))
+                row_lines.append(record_line)
+            except (ValueError, csv.Error) as e:
+                errors.append(
+                    AttendanceImportError(line=record_line, detail=_error_detail(e))
+                )
+
+            if pending >= IMPORT_BATCH_SIZE:
+                batches.append(
+                    await _import_batch(
+                        db, len(batches) + 1, first_line, line_no,
+                        rows, row_lines, errors,
+                    )
+                )
+                rows, row_lines, errors = [], [], []
+                pending = 0
+                first_line = line_no + 1
+
+        if pending:
+            batches.append(
+                await _import_batch(
+                    db, len(batches) + 1, first_line, line_no,
+                    rows, row_lines, errors,
+                )
+            )
+
+        success = sum(b.success for b in batches)
+        failed = sum(b.failed for b in batches)
+        return AttendanceImportResponse(
+            total_rows=total_rows,
+            success=success,
+            failed=failed,
+            batches=batches,
         )
     except Exception as e:
         raise HTTPException(
@@ -72,30 +402,103 @@ def bulk_mark(payload: BulkAttendanceCreate, db: Session = Depends(get_db)):
         )
 
 
-@router.get("/date/{target_date}", response_model=DateAttendanceResponse)
-def get_by_date(target_date: date, db: Session = Depends(get_db)):
+def _export_chunks(
+    request: Request, date_from: date, date_to: date, format: str
+) -> Iterator[str]:
+    if format == "csv":
+        yield ",".join(EXPORT_COLUMNS) + "\r\n"
+
+    # The session is owned by the generator rather than a dependency so it
+    # stays open for as long as the response is streaming.
+    with open_read_session(request) as db:
+        for rows in iter_attendance_export(db, date_from, date_to):
+            if format == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                yield buffer.getvalue()
+            else:
+                yield "".join(
+                    json.dumps(
+                        dict(zip(EXPORT_COLUMNS, row)), default=date.isoformat
+                    ) + "\n"
+                    for row in rows
+                )
+
+
+@router.get("/export")
+async def export_records(
+    request: Request,
+    date_from: date = Query(),
+    date_to: date = Query(),
+    format: Literal["csv", "ndjson"] = Query(default="csv"),
+):
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must not be after date_to",
+        )
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"attendance_{date_from}_{date_to}.{format}"
+    return StreamingResponse(
+        _export_chunks(request, date_from, date_to, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get(
+    "/date/{target_date}",
+    response_model=DateAttendanceResponse,
+    dependencies=[
+        Depends(query_budget(1)),
+        Depends(
+            conditional_get(
+                lambda request: attendance_month_scopes(
+                    request.path_params["target_date"][:7]
+                )
+            )
+        ),
+    ],
+)
+async def get_by_date(
+    target_date: date,
+    department: str | None = Query(default=None),
+    status_filter: Literal["Present", "Absent", "unmarked"] | None = Query(
+        default=None, alias="status"
+    ),
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    after: str | None = Query(default=None),
+    db: DBSession = Depends(get_read_session),
+):
     try:
-        records = get_attendance_by_date(db, target_date)
-        present = sum(1 for r in records if r.status == "Present")
-        absent = sum(1 for r in records if r.status == "Absent")
-        unmarked = sum(1 for r in records if r.status is None)
-        return DateAttendanceResponse(
-            date=target_date,
-            records=records,
-            present=present,
-            absent=absent,
-            unmarked=unmarked,
+        roster = await run_db(
+            db, get_attendance_by_date, target_date, department, status_filter, limit, after
         )
+        return ORJSONResponse(roster)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
         )
 
 
-@router.get("/calendar/{year}/{month}", response_model=MonthSummaryResponse)
-def calendar_summary(year: int, month: int, db: Session = Depends(get_db)):
+@router.get(
+    "/calendar/{year}/{month}",
+    response_model=MonthSummaryResponse,
+    dependencies=[
+        Depends(query_budget(1)),
+        Depends(
+            conditional_get(
+                lambda request: attendance_month_scopes(
+                    f"{request.path_params['year']}-"
+                    f"{request.path_params['month'].zfill(2)}"
+                )
+            )
+        ),
+    ],
+)
+async def calendar_summary(year: int, month: int, db: DBSession = Depends(get_read_session)):
     try:
-        days = get_month_summary(db, year, month)
+        days = await run_db(db, get_month_summary, year, month)
         return MonthSummaryResponse(year=year, month=month, days=days)
     except Exception as e:
         raise HTTPException(
@@ -103,16 +506,82 @@ def calendar_summary(year: int, month: int, db: Session = Depends(get_db)):
         )
 
 
-@router.get("/{employee_id}", response_model=AttendanceListResponse)
-def get_records(
+@router.get(
+    "/bitmaps/{year}",
+    response_model=AttendanceBitmapResponse,
+    dependencies=[Depends(query_budget(1))],
+)
+async def year_bitmaps(
+    year: int = Path(ge=1, le=9998),
+    employee_ids: list[str] | None = Query(default=None),
+    department: str | None = Query(default=None),
+    db: DBSession = Depends(get_read_session),
+):
+    try:
+        key = (
+            year,
+            tuple(sorted(set(employee_ids))) if employee_ids else None,
+            department,
+        )
+        cached = bitmap_cache.get(key)
+        if cached is not None:
+            bitmaps, _ = cached
+        else:
+            bitmaps = await run_db(
+                db, get_attendance_bitmaps, year, employee_ids, department
+            )
+            if not reads_replica(db):
+                bitmap_cache.set(key, bitmaps)
+        return ORJSONResponse(bitmaps)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.get(
+    "/summary",
+    response_model=AttendanceSummaryListResponse,
+    dependencies=[Depends(query_budget(1))],
+)
+async def batch_summary(
+    employee_ids: list[str] | None = Query(default=None),
+    department: str | None = Query(default=None),
+    date_from: date | None = Query(default=None),
+    date_to: date | None = Query(default=None),
+    db: DBSession = Depends(get_read_session),
+):
+    try:
+        summaries = await run_db(
+            db, get_attendance_summaries, employee_ids, department, date_from, date_to
+        )
+        found = {s.employee_id for s in summaries}
+        not_found = [e for e in employee_ids or [] if e not in found]
+        return AttendanceSummaryListResponse(
+            summaries=summaries, total=len(summaries), not_found=not_found
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
+        )
+
+
+@router.get(
+    "/{employee_id}",
+    response_model=AttendanceListResponse,
+    dependencies=[Depends(query_budget(2))],
+)
+async def get_records(
     employee_id: str,
     date_from: date | None = Query(default=None),
     date_to: date | None = Query(default=None),
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_read_session),
 ):
     try:
-        records = get_attendance_by_employee(db, employee_id, date_from, date_to)
-        return AttendanceListResponse(records=records, total=len(records))
+        records = await run_db(
+            db, get_attendance_by_employee, employee_id, date_from, date_to
+        )
+        return ORJSONResponse({"records": records, "total": len(records)})
     except EmployeeNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -121,10 +590,14 @@ def get_records(
         )
 
 
-@router.get("/{employee_id}/summary", response_model=AttendanceSummary)
-def summary(employee_id: str, db: Session = Depends(get_db)):
+@router.get(
+    "/{employee_id}/summary",
+    response_model=AttendanceSummary,
+    dependencies=[Depends(query_budget(1))],
+)
+async def summary(employee_id: str, db: DBSession = Depends(get_read_session)):
     try:
-        return get_attendance_summary(db, employee_id)
+        return await run_db(db, get_attendance_summary, employee_id)
     except EmployeeNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
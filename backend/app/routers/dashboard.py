@@ -1,48 +1,197 @@
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
+from sqlalchemy import and_, case, func, select
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models.employee import Employee
+from app.cache import dashboard_cache, department_stats_cache
+from app.database import DBSession, get_read_session, reads_replica, run_db
+from app.metrics import query_budget
 from app.models.attendance import Attendance
+from app.models.employee import Employee
+from app.models.rollup import DailyAttendanceRollup
+from app.schemas.attendance import MAX_RANGE_DAYS
 
 router = APIRouter(prefix="/api/dashboard", tags=["Dashboard"])
 
+IST = timezone(timedelta(hours=5, minutes=30))
+
 
 class DashboardResponse(BaseModel):
     total_employees: int
     present_today: int
     absent_today: int
     unmarked_today: int
+    cache_age_seconds: float = 0.0
+
+
+class DepartmentStats(BaseModel):
+    department: str
+    headcount: int
+    present: int
+    absent: int
+    unmarked: int
+    present_rate: float
+    absent_rate: float
+    unmarked_rate: float
 
 
-@router.get("/", response_model=DashboardResponse)
-def dashboard_stats(db: Session = Depends(get_db)):
+class DepartmentStatsResponse(BaseModel):
+    date_from: date
+    date_to: date
+    days: int
+    departments: list[DepartmentStats]
+    cache_age_seconds: float = 0.0
+
+
+def _compute_stats(db: Session, today: date) -> DashboardResponse:
+    def rollup_count(column):
+        return func.coalesce(
+            select(column)
+            .where(DailyAttendanceRollup.date == today)
+            .scalar_subquery(),
+            0,
+        )
+
+    total_employees, present_today, absent_today = db.execute(
+        select(
+            select(func.count()).select_from(Employee).scalar_subquery(),
+            rollup_count(DailyAttendanceRollup.present),
+            rollup_count(DailyAttendanceRollup.absent),
+        )
+    ).one()
+
+    return DashboardResponse(
+        total_employees=total_employees,
+        present_today=present_today,
+        absent_today=absent_today,
+        unmarked_today=total_employees - present_today - absent_today,
+    )
+
+
+@router.get(
+    "/",
+    response_model=DashboardResponse,
+    dependencies=[Depends(query_budget(1))],
+)
+async def dashboard_stats(db: DBSession = Depends(get_read_session)):
     try:
-        IST = timezone(timedelta(hours=5, minutes=30))
         today = datetime.now(IST).date()
 
-        total_employees = db.query(Employee).count()
-        present_today = (
-            db.query(Attendance)
-            .filter(Attendance.date == today, Attendance.status == "Present")
-            .count()
+        cached = dashboard_cache.get(today)
+        if cached is not None:
+            stats, age = cached
+            return stats.model_copy(update={"cache_age_seconds": round(age, 3)})
+
+        stats = await run_db(db, _compute_stats, today)
+        if not reads_replica(db):
+            dashboard_cache.set(today, stats)
+        return stats
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
         )
-        absent_today = (
-            db.query(Attendance)
-            .filter(Attendance.date == today, Attendance.status == "Absent")
-            .count()
+
+
+def _rate(count: int, expected: int) -> float:
+    return round(count / expected, 4) if expected else 0.0
+
+
+def _compute_department_stats(
+    db: Session,
+    date_from: date,
+    date_to: date,
+    departments: tuple[str, ...] | None,
+) -> DepartmentStatsResponse:
+    """Per-department attendance over a range, from one grouped join.
+
+    Every employee is expected on every day of the range, so unmarked is
+    headcount * days minus the rows actually recorded.
+    """
+    query = (
+        select(
+            Employee.department,
+            func.count(func.distinct(Employee.id)),
+            func.count(case((Attendance.status == "Present", 1))),
+            func.count(case((Attendance.status == "Absent", 1))),
+        )
+        .select_from(Employee)
+        .outerjoin(
+            Attendance,
+            and_(
+                Attendance.employee_id == Employee.employee_id,
+                Attendance.date >= date_from,
+                Attendance.date <= date_to,
+            ),
+        )
+        .group_by(Employee.department)
+        .order_by(Employee.department)
+    )
+    if departments is not None:
+        query = query.where(Employee.department.in_(departments))
+
+    days = (date_to - date_from).days + 1
+    stats = []
+    for department, headcount, present, absent in db.execute(query):
+        expected = headcount * days
+        unmarked = max(expected - present - absent, 0)
+        stats.append(
+            DepartmentStats(
+                department=department,
+                headcount=headcount,
+                present=present,
+                absent=absent,
+                unmarked=unmarked,
+                present_rate=_rate(present, expected),
+                absent_rate=_rate(absent, expected),
+                unmarked_rate=_rate(unmarked, expected),
+            )
         )
-        unmarked_today = total_employees - present_today - absent_today
+    return DepartmentStatsResponse(
+        date_from=date_from, date_to=date_to, days=days, departments=stats
+    )
+
+
+@router.get(
+    "/departments",
+    response_model=DepartmentStatsResponse,
+    dependencies=[Depends(query_budget(1))],
+)
+async def department_stats(
+    date_from: date | None = Query(default=None),
+    date_to: date | None = Query(default=None),
+    department: list[str] | None = Query(default=None),
+    db: DBSession = Depends(get_read_session),
+):
+    today = datetime.now(IST).date()
+    date_to = date_to or today
+    date_from = date_from or date_to.replace(day=1)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from must not be after date_to",
+        )
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {MAX_RANGE_DAYS} days",
+        )
+
+    try:
+        departments = tuple(sorted(set(department))) if department else None
+        key = (date_from, date_to, departments)
+        cached = department_stats_cache.get(key)
+        if cached is not None:
+            stats, age = cached
+            return stats.model_copy(update={"cache_age_seconds": round(age, 3)})
 
-        return DashboardResponse(
-            total_employees=total_employees,
-            present_today=present_today,
-            absent_today=absent_today,
-            unmarked_today=unmarked_today,
+        stats = await run_db(
+            db, _compute_department_stats, date_from, date_to, departments
         )
+        if not reads_replica(db):
+            department_stats_cache.set(key, stats)
+        return stats
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
@@ -1,23 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 
-from app.database import get_db
-from app.schemas.employee import EmployeeCreate, EmployeeResponse, EmployeeListResponse
+from app.database import DBSession, get_read_session, get_session, run_db
+from app.conditional import conditional_get
+from app.metrics import query_budget
+from app.schemas.employee import (
+    EmployeeCreate,
+    EmployeeResponse,
+    EmployeeListResponse,
+)
 from app.crud.employee import (
     create_employee,
     get_all_employees,
+    get_employee_page,
+    count_employees,
     get_employee_by_id,
     delete_employee,
 )
-from app.exceptions import EmployeeNotFoundError, DuplicateEmployeeError
+from app.exceptions import (
+    EmployeeNotFoundError,
+    DuplicateEmployeeError,
+    ValidationError,
+)
 
 router = APIRouter(prefix="/api/employees", tags=["Employees"])
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
 
-@router.post("/", response_model=EmployeeResponse, status_code=status.HTTP_201_CREATED)
-def create(employee_data: EmployeeCreate, db: Session = Depends(get_db)):
+@router.post(
+    "/",
+    response_model=EmployeeResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(query_budget(4))],
+)
+async def create(employee_data: EmployeeCreate, db: DBSession = Depends(get_session)):
     try:
-        return create_employee(db, employee_data)
+        return await run_db(db, create_employee, employee_data)
     except DuplicateEmployeeError as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except Exception as e:
@@ -26,21 +46,54 @@ def create(employee_data: EmployeeCreate, db: Session = Depends(get_db)):
         )
 
 
-@router.get("/", response_model=EmployeeListResponse)
-def list_all(db: Session = Depends(get_db)):
+@router.get(
+    "/",
+    response_model=EmployeeListResponse,
+    dependencies=[
+        Depends(query_budget(2)),
+        Depends(conditional_get(lambda request: ("employees",))),
+    ],
+)
+async def list_all(
+    limit: int | None = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = Query(default=None),
+    fields: str | None = Query(default=None),
+    db: DBSession = Depends(get_read_session),
+):
     try:
-        employees = get_all_employees(db)
-        return EmployeeListResponse(employees=employees, total=len(employees))
+        field_list = None
+        if fields:
+            field_list = [f.strip() for f in fields.split(",") if f.strip()] or None
+
+        if limit is None and cursor is None:
+            employees = await run_db(db, get_all_employees, field_list)
+            total = len(employees)
+            next_cursor = None
+        else:
+            employees, next_cursor = await run_db(
+                db, get_employee_page, limit or DEFAULT_PAGE_SIZE, cursor, field_list
+            )
+            total = await run_db(db, count_employees)
+
+        return ORJSONResponse(
+            {"employees": employees, "total": total, "next_cursor": next_cursor}
+        )
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e)
         )
 
 
-@router.get("/{employee_id}", response_model=EmployeeResponse)
-def get_one(employee_id: str, db: Session = Depends(get_db)):
+@router.get(
+    "/{employee_id}",
+    response_model=EmployeeResponse,
+    dependencies=[Depends(query_budget(1))],
+)
+async def get_one(employee_id: str, db: DBSession = Depends(get_read_session)):
     try:
-        return get_employee_by_id(db, employee_id)
+        return await run_db(db, get_employee_by_id, employee_id)
     except EmployeeNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except Exception as e:
@@ -49,10 +102,14 @@ def get_one(employee_id: str, db: Session = Depends(get_db)):
         )
 
 
-@router.delete("/{employee_id}")
-def delete(employee_id: str, db: Session = Depends(get_db)):
+@router.delete(
+    "/{employee_id}",
+    # Includes the PostgreSQL-only rollup row lock.
+    dependencies=[Depends(query_budget(6))],
+)
+async def delete(employee_id: str, db: DBSession = Depends(get_session)):
     try:
-        delete_employee(db, employee_id)
+        await run_db(db, delete_employee, employee_id)
         return {"message": f"Employee {employee_id} deleted successfully"}
     except EmployeeNotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -1,10 +1,24 @@
-from app.schemas.employee import EmployeeCreate, EmployeeResponse, EmployeeListResponse
+from app.schemas.employee import (
+    EmployeeCreate,
+    EmployeeResponse,
+    EmployeeProjection,
+    EmployeeListResponse,
+)
 from app.schemas.attendance import (
     AttendanceCreate,
     AttendanceResponse,
     AttendanceListResponse,
+    AttendanceBitmap,
+    AttendanceBitmapResponse,
     AttendanceSummary,
+    AttendanceSummaryListResponse,
+    AttendanceImportError,
+    AttendanceImportBatch,
+    AttendanceImportResponse,
+    AttendanceRangeCreate,
+    AttendanceRangeResponse,
     BulkAttendanceCreate,
+    BulkAttendanceError,
     BulkAttendanceResponse,
     DateAttendanceRecord,
     DateAttendanceResponse,
@@ -15,12 +29,22 @@ from app.schemas.attendance import (
 __all__ = [
     "EmployeeCreate",
     "EmployeeResponse",
+    "EmployeeProjection",
     "EmployeeListResponse",
     "AttendanceCreate",
     "AttendanceResponse",
     "AttendanceListResponse",
+    "AttendanceBitmap",
+    "AttendanceBitmapResponse",
     "AttendanceSummary",
+    "AttendanceSummaryListResponse",
+    "AttendanceImportError",
+    "AttendanceImportBatch",
+    "AttendanceImportResponse",
+    "AttendanceRangeCreate",
+    "AttendanceRangeResponse",
     "BulkAttendanceCreate",
+    "BulkAttendanceError",
     "BulkAttendanceResponse",
     "DateAttendanceRecord",
     "DateAttendanceResponse",
@@ -1,7 +1,10 @@
 from datetime import date, datetime, timedelta, timezone
 from typing import Literal
 
-from pydantic import BaseModel, ConfigDict, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
+
+IST = timezone(timedelta(hours=5, minutes=30))
+MAX_RANGE_DAYS = 366
 
 
 class AttendanceCreate(BaseModel):
@@ -12,7 +15,6 @@ class AttendanceCreate(BaseModel):
     @field_validator("date")
     @classmethod
     def date_not_in_future(cls, v: date) -> date:
-        IST = timezone(timedelta(hours=5, minutes=30))
         current_date = datetime.now(IST).date()
         if v > current_date:
             raise ValueError("Attendance date cannot be in the future")
@@ -42,14 +44,82 @@ class AttendanceSummary(BaseModel):
     absent_days: int
 
 
+class AttendanceSummaryListResponse(BaseModel):
+    summaries: list[AttendanceSummary]
+    total: int
+    not_found: list[str] = []
+
+
 class BulkAttendanceCreate(BaseModel):
     records: list[AttendanceCreate]
 
 
+class BulkAttendanceError(BaseModel):
+    index: int
+    employee_id: str
+    date: date
+    detail: str
+
+
 class BulkAttendanceResponse(BaseModel):
     success: int
     failed: int
     results: list[AttendanceResponse]
+    errors: list[BulkAttendanceError] = []
+
+
+class AttendanceImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class AttendanceImportBatch(BaseModel):
+    batch: int
+    first_line: int
+    last_line: int
+    success: int
+    failed: int
+    errors: list[AttendanceImportError]
+
+
+class AttendanceImportResponse(BaseModel):
+    total_rows: int
+    success: int
+    failed: int
+    batches: list[AttendanceImportBatch]
+
+
+class AttendanceRangeCreate(BaseModel):
+    """Mark every employee in a department, or an explicit list, for a range."""
+
+    employee_ids: list[str] | None = None
+    department: str | None = None
+    date_from: date
+    date_to: date
+    status: Literal["Present", "Absent"]
+    on_existing: Literal["skip", "overwrite"] = "skip"
+
+    @model_validator(mode="after")
+    def check_range(self) -> "AttendanceRangeCreate":
+        if (self.employee_ids is None) == (self.department is None):
+            raise ValueError("Provide exactly one of employee_ids or department")
+        if self.employee_ids is not None and not self.employee_ids:
+            raise ValueError("employee_ids must not be empty")
+        if self.date_to < self.date_from:
+            raise ValueError("date_to must not be before date_from")
+        if self.date_to > datetime.now(IST).date():
+            raise ValueError("Attendance date cannot be in the future")
+        if (self.date_to - self.date_from).days >= MAX_RANGE_DAYS:
+            raise ValueError(f"Date range cannot exceed {MAX_RANGE_DAYS} days")
+        return self
+
+
+class AttendanceRangeResponse(BaseModel):
+    employees: int
+    days: int
+    written: int
+    skipped: int
+    not_found: list[str] = []
 
 
 class DateAttendanceRecord(BaseModel):
@@ -66,6 +136,27 @@ class DateAttendanceResponse(BaseModel):
     present: int
     absent: int
     unmarked: int
+    total: int = 0
+    next_cursor: str | None = None
+
+
+class AttendanceBitmap(BaseModel):
+    employee_id: str
+    marked: str
+    present: str
+
+
+class AttendanceBitmapResponse(BaseModel):
+    """A year of attendance per employee as two packed, base64-encoded bitsets.
+
+    Bit ``n`` (day ``n`` of the year, Jan 1 = 0) lives in byte ``n // 8`` at
+    position ``n % 8``, least significant bit first. ``marked`` has the bit
+    set for every recorded day, ``present`` only for days marked Present.
+    """
+
+    year: int
+    days: int
+    employees: list[AttendanceBitmap]
 
 
 class MonthSummaryDay(BaseModel):
@@ -34,6 +34,17 @@ class EmployeeResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class EmployeeProjection(BaseModel):
+    id: int | None = None
+    employee_id: str | None = None
+    full_name: str | None = None
+    email: str | None = None
+    department: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+
+
 class EmployeeListResponse(BaseModel):
-    employees: list[EmployeeResponse]
+    employees: list[EmployeeResponse | EmployeeProjection]
     total: int
+    next_cursor: str | None = None
@@ -0,0 +1,97 @@
+"""Log slow SQL statements together with their query plan.
+
+Statements slower than SLOW_QUERY_MS are sampled at SLOW_QUERY_SAMPLE_RATE;
+each sampled one is logged with its parameters, the calling route and an
+EXPLAIN run on the same connection. EXPLAIN ANALYZE (SLOW_QUERY_EXPLAIN_ANALYZE)
+executes the statement again, so it is only ever used for SELECTs.
+
+Only plain DML is explained, never DDL, LOCK and the like. On PostgreSQL the
+EXPLAIN runs inside a savepoint, so a failing or side-effecting EXPLAIN is
+rolled back without touching the caller's transaction.
+"""
+
+import logging
+import random
+
+from app.config import settings
+
+logger = logging.getLogger("app.slow_queries")
+
+MAX_PARAMS_LENGTH = 500
+EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+_SAVEPOINT = "slow_query_explain"
+# psycopg2.extensions.TRANSACTION_STATUS_*, without importing the driver.
+_PG_IN_TRANSACTION = 2
+_PG_IN_ERROR = 3
+
+
+def _explain_prefix(dialect: str, statement: str) -> str | None:
+    if dialect == "sqlite":
+        return "EXPLAIN QUERY PLAN "
+    if dialect != "postgresql":
+        return None
+    if settings.SLOW_QUERY_EXPLAIN_ANALYZE and statement.lstrip().upper().startswith("SELECT"):
+        return "EXPLAIN (ANALYZE, BUFFERS) "
+    return "EXPLAIN "
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    if not statement.lstrip().upper().startswith(EXPLAINABLE):
+        return "(EXPLAIN skipped for this statement)"
+    prefix = _explain_prefix(conn.dialect.name, statement)
+    if prefix is None:
+        return "(EXPLAIN not supported for this dialect)"
+    if isinstance(parameters, list):
+        parameters = parameters[0] if parameters else None
+
+    dbapi_conn = conn.connection.dbapi_connection
+    savepoint = False
+    if conn.dialect.name == "postgresql":
+        # psycopg2 reports the server-side state; asyncpg's adapter does not,
+        # so fall back to whether SQLAlchemy has begun a transaction.
+        info = getattr(dbapi_conn, "info", None)
+        if info is None:
+            savepoint = conn.in_transaction()
+        elif info.transaction_status == _PG_IN_ERROR:
+            return "(EXPLAIN skipped: transaction already aborted)"
+        else:
+            savepoint = info.transaction_status == _PG_IN_TRANSACTION
+
+    # A separate DBAPI cursor keeps the original result set intact and
+    # bypasses engine events, so the EXPLAIN is neither timed nor counted.
+    cursor = dbapi_conn.cursor()
+    try:
+        if savepoint:
+            cursor.execute(f"SAVEPOINT {_SAVEPOINT}")
+        try:
+            cursor.execute(prefix + statement, parameters or ())
+            plan = "\n".join(
+                " ".join(str(col) for col in row) for row in cursor.fetchall()
+            )
+        except Exception as e:
+            plan = f"(EXPLAIN failed: {e})"
+        if savepoint:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {_SAVEPOINT}")
+            cursor.execute(f"RELEASE SAVEPOINT {_SAVEPOINT}")
+        return plan
+    finally:
+        cursor.close()
+
+
+def log_if_slow(conn, statement: str, parameters, elapsed: float, route: str | None) -> None:
+    if not settings.SLOW_QUERY_MS or elapsed * 1000 < settings.SLOW_QUERY_MS:
+        return
+    if random.random() >= settings.SLOW_QUERY_SAMPLE_RATE:
+        return
+
+    params = repr(parameters)
+    if len(params) > MAX_PARAMS_LENGTH:
+        params = params[:MAX_PARAMS_LENGTH] + "..."
+    logger.warning(
+        "Slow query (%.1fms) on %s\nSQL: %s\nParameters: %s\nPlan:\n%s",
+        elapsed * 1000,
+        route or "(no request)",
+        statement,
+        params,
+        _explain(conn, statement, parameters),
+    )
@@ -0,0 +1,103 @@
+"""Compare request concurrency of the sync and async database modes.
+
+Starts the API twice under uvicorn, once with ASYNC_DB=false and once with
+ASYNC_DB=true, against the DATABASE_URL from the environment/.env, and fires
+batches of concurrent GET requests at each. Prints one JSON object per
+(mode, concurrency) pair.
+
+Usage (from backend/):
+    python benchmarks/async_concurrency.py [--path /api/employees/?limit=50]
+        [--concurrency 10 50 100 200] [--requests 1000]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def start_server(async_db: bool, port: int) -> subprocess.Popen:
+    env = {**os.environ, "ASYNC_DB": "true" if async_db else "false"}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return proc
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("Server did not become healthy within 30s")
+
+
+async def run_load(base_url: str, path: str, concurrency: int, total: int) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait(i)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        async def worker() -> None:
+            nonlocal errors
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                try:
+                    r = await client.get(path)
+                    if r.status_code != 200:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="/api/employees/?limit=50")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    for mode, async_db in (("sync", False), ("async", True)):
+        proc = start_server(async_db, args.port)
+        try:
+            for concurrency in args.concurrency:
+                result = asyncio.run(
+                    run_load(f"http://127.0.0.1:{args.port}", args.path, concurrency, args.requests)
+                )
+                print(json.dumps({"mode": mode, "path": args.path, **result}), flush=True)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
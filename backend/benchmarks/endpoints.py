@@ -0,0 +1,266 @@
+"""Endpoint benchmark suite over a synthetic dataset.
+
+Seeds (or reuses) a synthetic dataset, then exercises every route in the
+employees, attendance and dashboard routers in-process through TestClient.
+Writes one JSON document with p50/p95/p99 latency per route, rows/sec for
+the bulk paths and peak RSS, so runs can be diffed between commits.
+
+Usage (from backend/):
+    python benchmarks/endpoints.py --database-url sqlite:///bench.db \\
+        --employees 10000 --days 365 --iterations 50 --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    if len(samples) < 2:
+        value = round(samples[0] * 1000, 3) if samples else 0.0
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value}
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": round(q[49] * 1000, 3),
+        "p95_ms": round(q[94] * 1000, 3),
+        "p99_ms": round(q[98] * 1000, 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default="sqlite:///bench.db")
+    parser.add_argument("--employees", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--bulk-rows", type=int, default=5_000)
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--output", help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so the URL must be in place first.
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("QUERY_BUDGET_MODE", "raise")
+
+    from fastapi.testclient import TestClient
+
+    from app.database import Base, SessionLocal, engine
+    from app.main import app
+    from benchmarks.seed import DEPARTMENTS, employee_id, is_seeded, seed
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        if args.reseed or not is_seeded(db, args.employees, args.days):
+            started = time.perf_counter()
+            seed(db, args.employees, args.days)
+            print(
+                f"Seeded {args.employees} employees x {args.days} days "
+                f"in {time.perf_counter() - started:.1f}s",
+                file=sys.stderr,
+            )
+
+    client = TestClient(app)
+    today = date.today()
+    seeded_day = today - timedelta(days=1)
+    results: list[dict] = []
+
+    def bench(
+        name: str,
+        call: Callable[[int], object],
+        rows: int | None = None,
+        iterations: int = args.iterations,
+    ) -> None:
+        samples = []
+        for i in range(iterations):
+            started = time.perf_counter()
+            response = call(i)
+            samples.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{name}: {response.status_code} {response.text[:200]}")
+        entry = {"route": name, "iterations": iterations, **percentiles(samples)}
+        if rows:
+            entry["rows_per_sec"] = round(rows / statistics.median(samples), 1)
+        results.append(entry)
+        print(f"  {name}: p50={entry['p50_ms']}ms", file=sys.stderr)
+
+    sample_id = employee_id(args.employees // 2)
+    scratch_id = "BENCH-SCRATCH"
+    client.delete(f"/api/employees/{scratch_id}")
+    client.post(
+        "/api/employees/",
+        json={
+            "employee_id": scratch_id,
+            "full_name": "Bench Scratch",
+            "email": "bench-scratch@example.com",
+            "department": DEPARTMENTS[0],
+        },
+    )
+
+    # Employees
+    bench("GET /api/employees/", lambda i: client.get("/api/employees/"), iterations=max(args.iterations // 10, 2))
+    bench("GET /api/employees/?limit=50", lambda i: client.get("/api/employees/?limit=50"))
+    bench(
+        "GET /api/employees/?limit=50&fields=...",
+        lambda i: client.get("/api/employees/?limit=50&fields=employee_id,full_name,department"),
+    )
+    bench("GET /api/employees/{id}", lambda i: client.get(f"/api/employees/{sample_id}"))
+    bench(
+        "POST /api/employees/",
+        lambda i: client.post(
+            "/api/employees/",
+            json={
+                "employee_id": f"BENCH-NEW-{i}",
+                "full_name": "Bench New",
+                "email": f"bench-new-{i}@example.com",
+                "department": DEPARTMENTS[1],
+            },
+        ),
+    )
+    bench("DELETE /api/employees/{id}", lambda i: client.delete(f"/api/employees/BENCH-NEW-{i}"))
+
+    # Attendance writes
+    old_day = today - timedelta(days=args.days + 10)
+    bench(
+        "POST /api/attendance/",
+        lambda i: client.post(
+            "/api/attendance/",
+            json={"employee_id": scratch_id, "date": str(old_day - timedelta(days=i)), "status": "Present"},
+        ),
+    )
+    bench(
+        "PUT /api/attendance/",
+        lambda i: client.put(
+            "/api/attendance/",
+            json={"employee_id": sample_id, "date": str(seeded_day), "status": ("Present", "Absent")[i % 2]},
+        ),
+    )
+    bulk_rows = min(args.bulk_rows, args.employees)
+    bulk_payload = {
+        "records": [
+            {"employee_id": employee_id(n), "date": str(seeded_day), "status": "Present"}
+            for n in range(bulk_rows)
+        ]
+    }
+    bench(
+        "POST /api/attendance/bulk",
+        lambda i: client.post("/api/attendance/bulk", json=bulk_payload),
+        rows=bulk_rows,
+        iterations=max(args.iterations // 10, 2),
+    )
+    range_days = min(args.days, 7)
+    range_department = DEPARTMENTS[3]
+    bench(
+        "POST /api/attendance/range",
+        lambda i: client.post(
+            "/api/attendance/range",
+            json={
+                "department": range_department,
+                "date_from": str(seeded_day - timedelta(days=range_days - 1)),
+                "date_to": str(seeded_day),
+                "status": ("Present", "Absent")[i % 2],
+                "on_existing": "overwrite",
+            },
+        ),
+        rows=len(range(3, args.employees, len(DEPARTMENTS))) * range_days,
+        iterations=max(args.iterations // 10, 2),
+    )
+    import_body = "employee_id,date,status\n" + "".join(
+        f"{employee_id(n)},{seeded_day},Absent\n" for n in range(bulk_rows)
+    )
+    bench(
+        "POST /api/attendance/import",
+        lambda i: client.post("/api/attendance/import", content=import_body, headers={"Content-Type": "text/csv"}),
+        rows=bulk_rows,
+        iterations=max(args.iterations // 10, 2),
+    )
+
+    # Attendance reads
+    bench("GET /api/attendance/date/{date}", lambda i: client.get(f"/api/attendance/date/{seeded_day}"))
+    bench(
+        "GET /api/attendance/date/{date}?department=&status=&limit=50",
+        lambda i: client.get(
+            f"/api/attendance/date/{seeded_day}?department={DEPARTMENTS[0]}&status=Absent&limit=50"
+        ),
+    )
+    bench(
+        "GET /api/attendance/calendar/{year}/{month}",
+        lambda i: client.get(f"/api/attendance/calendar/{seeded_day.year}/{seeded_day.month}"),
+    )
+    bench(
+        "GET /api/attendance/summary?department=",
+        lambda i: client.get(f"/api/attendance/summary?department={DEPARTMENTS[2]}"),
+    )
+    bench(
+        "GET /api/attendance/bitmaps/{year}?department=",
+        lambda i: client.get(f"/api/attendance/bitmaps/{seeded_day.year}?department={DEPARTMENTS[4]}"),
+    )
+    bench("GET /api/attendance/{employee_id}", lambda i: client.get(f"/api/attendance/{sample_id}"))
+    bench("GET /api/attendance/{employee_id}/summary", lambda i: client.get(f"/api/attendance/{sample_id}/summary"))
+    export_from = today - timedelta(days=min(args.days, 30))
+    bench(
+        "GET /api/attendance/export",
+        lambda i: client.get(f"/api/attendance/export?date_from={export_from}&date_to={today}"),
+        rows=args.employees * min(args.days, 30),
+        iterations=max(args.iterations // 10, 2),
+    )
+
+    # Dashboard
+    bench("GET /api/dashboard/", lambda i: client.get("/api/dashboard/"))
+    bench("GET /api/dashboard/departments", lambda i: client.get("/api/dashboard/departments"))
+    bench(
+        "GET /api/dashboard/departments?date_from=&date_to=",
+        lambda i: client.get(
+            f"/api/dashboard/departments?date_from={today - timedelta(days=min(args.days, 90))}&date_to={today}"
+        ),
+    )
+
+    client.delete(f"/api/employees/{scratch_id}")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "database": engine.dialect.name,
+            "employees": args.employees,
+            "days": args.days,
+            "iterations": args.iterations,
+            "bulk_rows": bulk_rows,
+            "python": platform.python_version(),
+        },
+        "results": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Seed a synthetic HRMS dataset for benchmarking.
+
+Creates ``employees`` employees spread over a handful of departments and one
+attendance row per employee per day for the ``days`` days before today
+(roughly 90% present), then rebuilds the daily rollup.
+"""
+
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.crud.rollup import refresh_daily_rollup
+from app.models import Attendance, Employee
+
+DEPARTMENTS = ["Engineering", "Sales", "Operations", "Finance", "HR", "Support"]
+INSERT_BATCH = 10_000
+
+
+def employee_id(n: int) -> str:
+    return f"BENCH-{n:06d}"
+
+
+def is_seeded(db: Session, employees: int, days: int) -> bool:
+    employee_count = db.scalar(select(func.count()).select_from(Employee))
+    attendance_count = db.scalar(select(func.count()).select_from(Attendance))
+    return employee_count == employees and attendance_count == employees * days
+
+
+def seed(db: Session, employees: int, days: int, seed_value: int = 42) -> None:
+    rng = random.Random(seed_value)
+    db.execute(Attendance.__table__.delete())
+    db.execute(Employee.__table__.delete())
+
+    db.execute(
+        insert(Employee),
+        [
+            {
+                "employee_id": employee_id(n),
+                "full_name": f"Bench Employee {n}",
+                "email": f"bench{n}@example.com",
+                "department": DEPARTMENTS[n % len(DEPARTMENTS)],
+            }
+            for n in range(employees)
+        ],
+    )
+
+    start = date.today() - timedelta(days=days)
+    batch: list[dict] = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        for n in range(employees):
+            batch.append(
+                {
+                    "employee_id": employee_id(n),
+                    "date": day,
+                    "status": "Present" if rng.random() < 0.9 else "Absent",
+                }
+            )
+            if len(batch) >= INSERT_BATCH:
+                db.execute(insert(Attendance), batch)
+                batch = []
+    if batch:
+        db.execute(insert(Attendance), batch)
+
+    refresh_daily_rollup(db)
+    db.commit()
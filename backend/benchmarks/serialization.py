@@ -0,0 +1,114 @@
+"""Compare response serialization paths on the largest list endpoints.
+
+For each endpoint shape, times the previous path (ORM objects validated into
+the Pydantic response model with from_attributes, then dumped to JSON)
+against the fast path (plain column rows encoded directly with orjson),
+including the query in both. Reuses the dataset seeded by endpoints.py.
+
+Usage (from backend/):
+    python benchmarks/serialization.py --database-url sqlite:///bench.db
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from collections.abc import Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def median_ms(fn: Callable[[], bytes], iterations: int) -> tuple[float, int]:
+    samples = []
+    size = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        size = len(fn())
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3), size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default="sqlite:///bench.db")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url
+
+    import orjson
+    from sqlalchemy import func, select
+
+    from app.crud.attendance import get_attendance_by_date, get_attendance_by_employee
+    from app.crud.employee import get_all_employees
+    from app.database import SessionLocal
+    from app.models import Attendance, Employee
+    from app.schemas.attendance import (
+        AttendanceListResponse,
+        DateAttendanceRecord,
+        DateAttendanceResponse,
+    )
+    from app.schemas.employee import EmployeeListResponse
+
+    with SessionLocal() as db:
+        busiest = db.execute(
+            select(Attendance.employee_id).group_by(Attendance.employee_id)
+            .order_by(func.count().desc()).limit(1)
+        ).scalar_one()
+        latest_day = db.scalar(select(func.max(Attendance.date)))
+
+        def employees_old() -> bytes:
+            employees = db.query(Employee).order_by(Employee.created_at.desc()).all()
+            return EmployeeListResponse(employees=employees, total=len(employees)).model_dump_json().encode()
+
+        def employees_fast() -> bytes:
+            employees = get_all_employees(db)
+            return orjson.dumps({"employees": employees, "total": len(employees), "next_cursor": None})
+
+        def attendance_old() -> bytes:
+            records = (
+                db.query(Attendance).filter(Attendance.employee_id == busiest)
+                .order_by(Attendance.date.desc()).all()
+            )
+            return AttendanceListResponse(records=records, total=len(records)).model_dump_json().encode()
+
+        def attendance_fast() -> bytes:
+            records = get_attendance_by_employee(db, busiest)
+            return orjson.dumps({"records": records, "total": len(records)})
+
+        def roster_old() -> bytes:
+            roster = get_attendance_by_date(db, latest_day)
+            records = [DateAttendanceRecord(**r) for r in roster["records"]]
+            return DateAttendanceResponse(**{**roster, "records": records}).model_dump_json().encode()
+
+        def roster_fast() -> bytes:
+            return orjson.dumps(get_attendance_by_date(db, latest_day))
+
+        cases = [
+            ("GET /api/employees/", employees_old, employees_fast),
+            ("GET /api/attendance/{employee_id}", attendance_old, attendance_fast),
+            ("GET /api/attendance/date/{date}", roster_old, roster_fast),
+        ]
+        results = []
+        for name, old, fast in cases:
+            old_ms, old_bytes = median_ms(old, args.iterations)
+            db.expunge_all()
+            fast_ms, fast_bytes = median_ms(fast, args.iterations)
+            results.append(
+                {
+                    "endpoint": name,
+                    "pydantic_ms": old_ms,
+                    "fast_ms": fast_ms,
+                    "speedup": round(old_ms / fast_ms, 2) if fast_ms else None,
+                    "bytes": fast_bytes,
+                    "pydantic_bytes": old_bytes,
+                }
+            )
+
+    print(json.dumps({"database": args.database_url.split(":", 1)[0], "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
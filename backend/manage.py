@@ -0,0 +1,84 @@
+"""Maintenance commands for HRMS Lite.
+
+Usage:
+    python manage.py rebuild-rollup [--from YYYY-MM-DD] [--to YYYY-MM-DD]
+    python manage.py partition-attendance [--months-ahead N]
+    python manage.py ensure-partitions [--months-ahead N]
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.crud.rollup import refresh_daily_rollup
+from app.partitions import ensure_partitions, is_partitioned, partition_attendance
+
+import app.models  # noqa: F401 — ensure models are registered
+
+
+def rebuild_rollup(args: argparse.Namespace) -> None:
+    dates = None
+    if args.date_from or args.date_to:
+        if not (args.date_from and args.date_to):
+            sys.exit("--from and --to must be given together")
+        days = (args.date_to - args.date_from).days
+        dates = [args.date_from + timedelta(days=i) for i in range(days + 1)]
+
+    with SessionLocal() as db:
+        refreshed = refresh_daily_rollup(db, dates)
+        db.commit()
+    print(f"Rebuilt daily_attendance_rollup: {refreshed} day(s) refreshed")
+
+
+def partition(args: argparse.Namespace) -> None:
+    try:
+        with engine.begin() as conn:
+            created = partition_attendance(conn, args.months_ahead)
+    except RuntimeError as e:
+        sys.exit(str(e))
+    print(f"Partitioned attendance by month: {len(created)} partition(s) created")
+
+
+def ensure(args: argparse.Namespace) -> None:
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            sys.exit("attendance is not partitioned; run partition-attendance first")
+        created = ensure_partitions(conn, args.months_ahead)
+    print(f"Created {len(created)} partition(s){': ' + ', '.join(created) if created else ''}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="HRMS Lite maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser(
+        "rebuild-rollup", help="Recompute daily_attendance_rollup from attendance"
+    )
+    rebuild.add_argument("--from", dest="date_from", type=date.fromisoformat)
+    rebuild.add_argument("--to", dest="date_to", type=date.fromisoformat)
+    rebuild.set_defaults(handler=rebuild_rollup)
+
+    for name, handler, help in (
+        (
+            "partition-attendance",
+            partition,
+            "Convert attendance to monthly range partitions (PostgreSQL)",
+        ),
+        ("ensure-partitions", ensure, "Create missing upcoming attendance partitions"),
+    ):
+        command = commands.add_parser(name, help=help)
+        command.add_argument(
+            "--months-ahead",
+            type=int,
+            default=settings.ATTENDANCE_PARTITIONS_AHEAD,
+        )
+        command.set_defaults(handler=handler)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
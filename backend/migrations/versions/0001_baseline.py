@@ -0,0 +1,76 @@
+"""Baseline schema as previously created by Base.metadata.create_all
+
+Databases that were bootstrapped by create_all already have these tables,
+so each step checks first and ``alembic upgrade head`` adopts them as-is.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0001"
+down_revision: str | None = None
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _existing_indexes(table: str) -> set[str]:
+    return {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("employees"):
+        _create_employees()
+    existing = _existing_indexes("employees")
+    for name, column in (
+        ("ix_employees_employee_id", "employee_id"),
+        ("ix_employees_email", "email"),
+    ):
+        if name not in existing:
+            op.create_index(name, "employees", [column], unique=True)
+
+    if not inspector.has_table("attendance"):
+        _create_attendance()
+    if "ix_attendance_employee_id" not in _existing_indexes("attendance"):
+        op.create_index("ix_attendance_employee_id", "attendance", ["employee_id"])
+
+
+def _create_employees() -> None:
+    op.create_table(
+        "employees",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("employee_id", sa.String(20), nullable=False),
+        sa.Column("full_name", sa.String(100), nullable=False),
+        sa.Column("email", sa.String(100), nullable=False),
+        sa.Column("department", sa.String(50), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+
+
+def _create_attendance() -> None:
+    op.create_table(
+        "attendance",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "employee_id",
+            sa.String(20),
+            sa.ForeignKey("employees.employee_id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("date", sa.Date(), nullable=False),
+        sa.Column("status", sa.String(10), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.UniqueConstraint("employee_id", "date", name="uq_employee_date"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("attendance")
+    op.drop_table("employees")
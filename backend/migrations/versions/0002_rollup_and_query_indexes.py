@@ -0,0 +1,67 @@
+"""Daily attendance rollup table and indexes for the hot query shapes
+
+- ix_attendance_date_status: roster and calendar lookups by date/date range,
+  and per-status counts for a day.
+- ix_employees_created_at_id: keyset pagination of the employee list.
+
+Both the table and the indexes may already exist on databases that were
+bootstrapped by create_all, so each step checks first. On PostgreSQL the
+indexes are built CONCURRENTLY to avoid locking out attendance writes.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0002"
+down_revision: str | None = "0001"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+INDEXES = [
+    ("ix_attendance_date_status", "attendance", ["date", "status"]),
+    ("ix_employees_created_at_id", "employees", ["created_at", "id"]),
+]
+
+
+def _existing_indexes(table: str) -> set[str]:
+    return {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    if not sa.inspect(op.get_bind()).has_table("daily_attendance_rollup"):
+        op.create_table(
+            "daily_attendance_rollup",
+            sa.Column("date", sa.Date(), primary_key=True),
+            sa.Column("present", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("absent", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("headcount", sa.Integer(), nullable=False, server_default="0"),
+        )
+        op.execute(
+            """
+            INSERT INTO daily_attendance_rollup (date, present, absent, headcount)
+            SELECT date,
+                   SUM(CASE WHEN status = 'Present' THEN 1 ELSE 0 END),
+                   SUM(CASE WHEN status = 'Absent' THEN 1 ELSE 0 END),
+                   COUNT(*)
+            FROM attendance
+            GROUP BY date
+            """
+        )
+
+    postgres = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            if name not in _existing_indexes(table):
+                op.create_index(name, table, columns, postgresql_concurrently=postgres)
+
+
+def downgrade() -> None:
+    for name, table, _ in INDEXES:
+        op.drop_index(name, table_name=table)
+    op.drop_table("daily_attendance_rollup")
@@ -0,0 +1,146 @@
+"""Check that the hot query shapes are served by an index (PostgreSQL only).
+
+Sequential scans are disabled for each EXPLAIN so the check reflects whether
+a usable index exists, not what the planner picks for a tiny test table.
+"""
+
+import sys
+from datetime import date
+
+from sqlalchemy import func, select, text, tuple_
+
+from app.database import engine
+from app.models import Attendance, DailyAttendanceRollup, Employee
+from app.partitions import is_partitioned, partition_name
+
+results = []
+TODAY = date(2025, 1, 15)
+
+
+def explain(stmt) -> str:
+    sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    with engine.begin() as conn:
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        return "\n".join(row[0] for row in conn.execute(text(f"EXPLAIN {sql}")))
+
+
+def index_names(index_name: str) -> set[str]:
+    """The index plus, on a partitioned table, its per-partition children."""
+    with engine.connect() as conn:
+        children = conn.scalars(
+            text(
+                "SELECT child.relname FROM pg_inherits i "
+                "JOIN pg_class parent ON parent.oid = i.inhparent "
+                "JOIN pg_class child ON child.oid = i.inhrelid "
+                "WHERE parent.relname = :name"
+            ),
+            {"name": index_name},
+        )
+        return {index_name, *children}
+
+
+def assert_uses_index(stmt, index_name: str) -> None:
+    plan = explain(stmt)
+    assert any(name in plan for name in index_names(index_name)), (
+        f"Expected {index_name} in plan:\n{plan}"
+    )
+
+
+def test_month_range_prunes_partitions():
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            return
+    plan = explain(
+        select(Attendance.date, Attendance.status)
+        .where(Attendance.date >= date(2025, 1, 1), Attendance.date <= date(2025, 1, 31))
+    )
+    assert partition_name(date(2025, 1, 1)) in plan, f"Expected January partition:\n{plan}"
+    for other in (date(2024, 12, 1), date(2025, 2, 1), None):
+        name = partition_name(other) if other else "attendance_default"
+        assert name not in plan, f"Expected {name} to be pruned:\n{plan}"
+
+
+def test_attendance_by_date():
+    assert_uses_index(
+        select(Attendance.employee_id, Attendance.status, Attendance.id)
+        .where(Attendance.date == TODAY),
+        "ix_attendance_date_status",
+    )
+
+
+def test_attendance_counts_by_date_and_status():
+    assert_uses_index(
+        select(func.count())
+        .select_from(Attendance)
+        .where(Attendance.date == TODAY, Attendance.status == "Present"),
+        "ix_attendance_date_status",
+    )
+
+
+def test_attendance_date_range():
+    assert_uses_index(
+        select(Attendance.date, Attendance.status)
+        .where(Attendance.date >= date(2025, 1, 1), Attendance.date <= date(2025, 1, 31)),
+        "ix_attendance_date_status",
+    )
+
+
+def test_attendance_by_employee():
+    assert_uses_index(
+        select(Attendance)
+        .where(Attendance.employee_id == "TEST-001", Attendance.date >= date(2025, 1, 1))
+        .order_by(Attendance.date.desc()),
+        "uq_employee_date",
+    )
+
+
+def test_month_rollup():
+    assert_uses_index(
+        select(DailyAttendanceRollup)
+        .where(
+            DailyAttendanceRollup.date >= date(2025, 1, 1),
+            DailyAttendanceRollup.date <= date(2025, 1, 31),
+        )
+        .order_by(DailyAttendanceRollup.date),
+        "daily_attendance_rollup_pkey",
+    )
+
+
+def test_employee_list_keyset():
+    assert_uses_index(
+        select(Employee)
+        .where(tuple_(Employee.created_at, Employee.id) < tuple_(func.now(), 1000))
+        .order_by(Employee.created_at.desc(), Employee.id.desc())
+        .limit(50),
+        "ix_employees_created_at_id",
+    )
+
+
+def run(name, fn):
+    try:
+        fn()
+        results.append((name, "PASS"))
+        print(f"  PASS  {name}")
+    except AssertionError as e:
+        results.append((name, "FAIL"))
+        print(f"  FAIL  {name} — {e}")
+
+
+if __name__ == "__main__":
+    print("\nHRMS Lite — Query Plan Checks\n" + "=" * 40)
+
+    run("attendance by date", test_attendance_by_date)
+    run("attendance counts by (date, status)", test_attendance_counts_by_date_and_status)
+    run("attendance date range", test_attendance_date_range)
+    run("attendance by employee", test_attendance_by_employee)
+    run("month rollup range", test_month_rollup)
+    run("employee list keyset page", test_employee_list_keyset)
+    run("month range prunes partitions", test_month_range_prunes_partitions)
+
+    print("=" * 40)
+    passed = sum(1 for _, s in results if s == "PASS")
+    total = len(results)
+    print(f"\nResults: {passed}/{total} passed")
+
+    if passed < total:
+        sys.exit(1)
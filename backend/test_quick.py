@@ -1,7 +1,12 @@
 """Quick smoke tests for HRMS Lite API endpoints."""
 
+import os
 import sys
 
+# Fail loudly when a route runs more SQL statements than its budget.
+os.environ.setdefault("QUERY_BUDGET_MODE", "raise")
+os.environ.setdefault("QUERY_COUNT_HEADER", "true")
+
 from fastapi.testclient import TestClient
 from app.main import app
 
@@ -59,6 +64,47 @@ def test_list_employees():
     data = r.json()
     assert "employees" in data
     assert isinstance(data["employees"], list)
+    assert "X-Query-Count" in r.headers, "Expected X-Query-Count header"
+
+
+def test_list_employees_not_modified():
+    r = client.get("/api/employees/")
+    etag = r.headers.get("ETag")
+    assert etag, "Expected ETag header"
+    r = client.get("/api/employees/", headers={"If-None-Match": etag})
+    assert r.status_code == 304, f"Expected 304, got {r.status_code}"
+    assert r.headers.get("X-Query-Count") == "0", "Expected no queries on 304"
+
+
+def test_list_employees_pagination():
+    # Created back to back, so on SQLite they share a second-precision
+    # created_at and only the id breaks ties.
+    created = [f"PAGE-{n}" for n in range(5)]
+    for employee_id in created:
+        r = client.post("/api/employees/", json={
+            "employee_id": employee_id,
+            "full_name": "Page Test",
+            "email": f"{employee_id.lower()}@example.com",
+            "department": "Sales",
+        })
+        assert r.status_code == 201, f"Expected 201, got {r.status_code}: {r.text}"
+    try:
+        seen, cursor = [], None
+        for _ in range(10):
+            params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+            r = client.get("/api/employees/", params=params)
+            assert r.status_code == 200, f"Expected 200, got {r.status_code}: {r.text}"
+            data = r.json()
+            seen += [e["employee_id"] for e in data["employees"]]
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        assert cursor is None, "Pagination did not terminate"
+        assert len(seen) == len(set(seen)), f"Duplicate rows across pages: {seen}"
+        assert set(created) <= set(seen), f"Missing rows: {set(created) - set(seen)}"
+    finally:
+        for employee_id in created:
+            client.delete(f"/api/employees/{employee_id}")
 
 
 def test_mark_attendance():
@@ -71,6 +117,60 @@ def test_mark_attendance():
     assert r.status_code == 201, f"Expected 201, got {r.status_code}: {r.text}"
 
 
+def _import_csv(*rows):
+    body = "employee_id,date,status,note\r\n" + "".join(rows)
+    r = client.post(
+        "/api/attendance/import", content=body, headers={"Content-Type": "text/csv"}
+    )
+    assert r.status_code == 200, f"Expected 200, got {r.status_code}: {r.text}"
+    data = r.json()
+    errors = [e["line"] for batch in data["batches"] for e in batch["errors"]]
+    return data, errors
+
+
+def _past_day(days_ago):
+    from datetime import date, timedelta
+    return str(date.today() - timedelta(days=days_ago))
+
+
+def test_import_multiline_field():
+    data, errors = _import_csv(
+        f'{TEST_EMPLOYEE_ID},{_past_day(1)},Present,"two\nlines"\r\n',
+        f"{TEST_EMPLOYEE_ID},{_past_day(2)},Absent,\r\n",
+    )
+    assert (data["total_rows"], data["success"], data["failed"]) == (2, 2, 0), data
+    assert errors == [], errors
+
+
+def test_import_stray_quote():
+    data, errors = _import_csv(
+        f'{TEST_EMPLOYEE_ID},{_past_day(3)},Present,5" screen\r\n',
+        f"{TEST_EMPLOYEE_ID},{_past_day(4)},Absent,\r\n",
+        f"{TEST_EMPLOYEE_ID},{_past_day(5)},Present,\r\n",
+    )
+    assert (data["total_rows"], data["success"], data["failed"]) == (3, 3, 0), data
+    assert errors == [], errors
+
+
+def test_import_bad_row():
+    data, errors = _import_csv(
+        f"{TEST_EMPLOYEE_ID},{_past_day(6)},Bogus,\r\n",
+        f'{TEST_EMPLOYEE_ID},{_past_day(7)},Present,"a\nb"\r\n',
+        f"{TEST_EMPLOYEE_ID},not-a-date,Present,\r\n",
+    )
+    assert (data["total_rows"], data["success"], data["failed"]) == (3, 1, 2), data
+    assert errors == [2, 5], errors
+
+
+def test_import_unknown_employee():
+    data, errors = _import_csv(
+        f"{TEST_EMPLOYEE_ID},{_past_day(8)},Present,\r\n",
+        f"NO-SUCH-EMPLOYEE,{_past_day(8)},Present,\r\n",
+    )
+    assert (data["total_rows"], data["success"], data["failed"]) == (2, 1, 1), data
+    assert errors == [3], errors
+
+
 def test_dashboard():
     r = client.get("/api/dashboard/")
     assert r.status_code == 200, f"Expected 200, got {r.status_code}"
@@ -93,7 +193,13 @@ if __name__ == "__main__":
     run("POST /api/employees (create)", test_create_employee)
     run("POST /api/employees (duplicate)", test_create_employee_duplicate)
     run("GET /api/employees (list)", test_list_employees)
+    run("GET /api/employees (If-None-Match)", test_list_employees_not_modified)
+    run("GET /api/employees (cursor pagination)", test_list_employees_pagination)
     run("POST /api/attendance (mark)", test_mark_attendance)
+    run("POST /api/attendance/import (multiline field)", test_import_multiline_field)
+    run("POST /api/attendance/import (stray quote)", test_import_stray_quote)
+    run("POST /api/attendance/import (bad row)", test_import_bad_row)
+    run("POST /api/attendance/import (unknown employee)", test_import_unknown_employee)
     run("GET /api/dashboard", test_dashboard)
     run("DELETE /api/employees/{id}", test_delete_employee)
 
@@ -5,8 +5,27 @@ const api = axios.create({
   timeout: 30000,
 });
 
+// Read-your-writes with a read replica: after a write the API returns a
+// deadline and we echo it back; the server (whose clock it is) decides
+// whether the read still has to go to the primary.
+const PRIMARY_UNTIL_HEADER = 'X-Read-Primary-Until';
+let primaryUntil = 0;
+
+api.interceptors.request.use((config) => {
+  if (primaryUntil) {
+    config.headers[PRIMARY_UNTIL_HEADER] = primaryUntil.toFixed(3);
+  }
+  return config;
+});
+
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const until = parseFloat(response.headers[PRIMARY_UNTIL_HEADER.toLowerCase()]);
+    if (until > primaryUntil) {
+      primaryUntil = until;
+    }
+    return response;
+  },
   (error) => {
     if (error.code === 'ECONNABORTED') {
       return Promise.reject('Request timed out. Please try again.');
@@ -33,8 +52,8 @@ api.interceptors.response.use(
 
 export const checkHealth = () => api.get('/health');
 
-export const fetchEmployees = async () => {
-  const { data } = await api.get('/api/employees');
+export const fetchEmployees = async (params = {}) => {
+  const { data } = await api.get('/api/employees', { params });
   return data;
 };
 
@@ -58,6 +77,14 @@ export const fetchAttendanceSummary = async (employeeId) => {
   return data;
 };
 
+export const fetchAttendanceSummaries = async (params = {}) => {
+  const { data } = await api.get('/api/attendance/summary', {
+    params,
+    paramsSerializer: { indexes: null },
+  });
+  return data;
+};
+
 export const markAttendance = async (attendanceData) => {
   const { data } = await api.post('/api/attendance', attendanceData);
   return data;
@@ -73,6 +100,11 @@ export const bulkMarkAttendance = async (records) => {
   return data;
 };
 
+export const markAttendanceRange = async (payload) => {
+  const { data } = await api.post('/api/attendance/range', payload);
+  return data;
+};
+
 export const fetchDateAttendance = async (dateStr) => {
   const { data } = await api.get(`/api/attendance/date/${dateStr}`);
   return data;
@@ -83,7 +115,23 @@ export const fetchCalendarSummary = async (year, month) => {
   return data;
 };
 
+export const fetchAttendanceBitmaps = async (year, params = {}) => {
+  const { data } = await api.get(`/api/attendance/bitmaps/${year}`, {
+    params,
+    paramsSerializer: { indexes: null },
+  });
+  return data;
+};
+
 export const fetchDashboard = async () => {
   const { data } = await api.get('/api/dashboard');
   return data;
 };
+
+export const fetchDepartmentStats = async (params = {}) => {
+  const { data } = await api.get('/api/dashboard/departments', {
+    params,
+    paramsSerializer: { indexes: null },
+  });
+  return data;
+};